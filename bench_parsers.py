@@ -0,0 +1,101 @@
+"""
+Offline benchmark for the roadrun parsers.
+Runs parse_schedule_html / parse_event_details_html over the saved
+debug_page.html and detail_debug.html snapshots, without touching the network.
+
+Usage:
+    python bench_parsers.py                 # all available backends, 20 iterations
+    python bench_parsers.py -n 50 --backend html.parser
+
+Peak memory is measured with tracemalloc, so it covers the Python heap only
+(lxml's C-level tree allocations are not included).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import scraper
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LIST_FIXTURE = os.path.join(BASE_DIR, 'debug_page.html')
+DETAIL_FIXTURE = os.path.join(BASE_DIR, 'detail_debug.html')
+
+
+def load_fixture(path):
+    """
+    Reads a saved roadrun page as text.
+    Raw EUC-KR snapshots are decoded directly; snapshots that were saved as
+    UTF-8 after a latin-1 mis-decode (mojibake) are repaired back to Korean.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('euc-kr', errors='replace')
+    try:
+        return text.encode('latin-1').decode('euc-kr', errors='replace')
+    except UnicodeEncodeError:
+        return text
+
+
+def available_backends():
+    backends = ['html.parser']
+    if scraper.PARSER_BACKEND == 'lxml':
+        backends.insert(0, 'lxml')
+    return backends
+
+
+def bench(label, parse, html, iterations):
+    # Warm-up run also yields the row count
+    result = parse(html)
+    rows = len(result)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parse(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean = statistics.mean(timings)
+    print(f"{label:<32} "
+          f"mean {mean * 1000:8.2f} ms  "
+          f"median {statistics.median(timings) * 1000:8.2f} ms  "
+          f"min {min(timings) * 1000:8.2f} ms  "
+          f"rows {rows:4d}  "
+          f"rows/s {rows / mean if mean else 0:10.0f}  "
+          f"peak {peak / 1024 / 1024:7.2f} MB")
+    return mean
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark roadrun HTML parsers on saved fixtures.")
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    parser.add_argument('--backend', action='append', choices=['lxml', 'html.parser'],
+                        help="Backend to benchmark (repeatable). Defaults to all available.")
+    args = parser.parse_args(argv)
+
+    backends = args.backend or available_backends()
+    list_html = load_fixture(LIST_FIXTURE)
+    detail_html = load_fixture(DETAIL_FIXTURE)
+
+    print(f"Fixtures: list {len(list_html) / 1024:.0f} KB, detail {len(detail_html) / 1024:.0f} KB, "
+          f"{args.iterations} iterations")
+    print("=" * 30)
+    for backend in backends:
+        bench(f"schedule [{backend}]", lambda h: scraper.parse_schedule_html(h, backend), list_html, args.iterations)
+        bench(f"details  [{backend}]", lambda h: scraper.parse_event_details_html(h, backend), detail_html, args.iterations)
+    print("=" * 30)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Reusable headless Chrome sessions for JS-rendered sources.
+Starting Chrome is the biggest fixed cost of a scrape, so drivers are kept warm and
+lent out to scrapers; each driver is health-checked on checkout and recycled after
+a number of uses or once its memory grows past a threshold.
+"""
+
+import atexit
+import contextlib
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def chrome_options():
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    return options
+
+
+def driver_memory_mb(driver):
+    """
+    Best-effort memory footprint of a driver in MB.
+    Sums the RSS of the Chrome process tree when psutil is installed,
+    otherwise falls back to the page's JS heap size.
+    """
+    try:
+        if psutil is not None:
+            service_process = psutil.Process(driver.service.process.pid)
+            processes = [service_process] + service_process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+        heap = driver.execute_script(
+            "return (performance.memory && performance.memory.usedJSHeapSize) || 0"
+        )
+        return (heap or 0) / 1024 / 1024
+    except Exception:
+        return 0
+
+
+class BrowserPool:
+    def __init__(self, size=1, max_uses=20, max_memory_mb=1024, driver_factory=None):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.driver_factory = driver_factory or (lambda: webdriver.Chrome(options=chrome_options()))
+        self._idle = []  # [driver, use_count] pairs
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                driver, uses = self._idle.pop()
+                if self._is_healthy(driver):
+                    return driver, uses
+                self._quit(driver)
+        return self.driver_factory(), 0
+
+    def _checkin(self, driver, uses, broken):
+        if broken or self._closed or uses >= self.max_uses:
+            self._quit(driver)
+            return
+        if self.max_memory_mb and driver_memory_mb(driver) > self.max_memory_mb:
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.append((driver, uses))
+
+    @contextlib.contextmanager
+    def borrow(self):
+        """
+        Lends a warm driver for the duration of the with-block.
+        A driver that raised inside the block is discarded instead of reused.
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool is shut down")
+        self._slots.acquire()
+        driver = None
+        broken = False
+        try:
+            driver, uses = self._checkout()
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            if driver is not None:
+                self._checkin(driver, uses + 1, broken)
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """
+    Process-wide pool shared by the JS-rendered scrapers; shut down at interpreter exit.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.shutdown)
+        return _default_pool
@@ -3,93 +3,320 @@ Cross-validation module for marathon event data from multiple sources.
 Compares data from roadrun.co.kr and runninglife.co.kr to ensure accuracy.
 """
 
+from collections import Counter
 from difflib import SequenceMatcher
-import re
-import datetime
+import math
 
-def normalize_event_name(name):
+from normalization import normalize_event_name, parse_event_date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def calculate_similarity(str1, str2):
     """
-    Normalize event name for comparison by:
-    - Converting to lowercase
-    - Removing special characters
-    - Removing extra whitespace
-    - Removing common prefixes like year numbers
+    Calculate similarity ratio between two strings using SequenceMatcher.
+    Returns a value between 0 and 1.
     """
-    if not name:
-        return ""
-    
-    # Convert to lowercase
-    normalized = name.lower()
+    return SequenceMatcher(None, str1, str2).ratio()
+
+# Events within this many days of each other get a score boost and are always compared
+DATE_WINDOW_DAYS = 3
+DATE_BOOST = 0.2
+
+def name_ngrams(normalized, n=2):
+    """
+    Character n-grams of a normalized name (spaces removed), used as blocking keys.
+    """
+    compact = normalized.replace(' ', '')
+    if len(compact) < n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+NGRAM_SIZES = (2, 3)
+
+def ngram_profile(normalized):
+    """
+    Bag of character bigrams and trigrams of a normalized name (spaces removed).
+    """
+    compact = normalized.replace(' ', '')
+    profile = Counter()
+    for n in NGRAM_SIZES:
+        for i in range(len(compact) - n + 1):
+            profile[compact[i:i + n]] += 1
+    if not profile and compact:
+        profile[compact] = 1
+    return profile
+
+class NgramScorer:
+    """
+    Batch cosine similarity over character n-gram vectors.
+    Names are encoded once into L2-normalized vectors; similarity_matrix() scores many
+    query names against all of them in one matrix product (NumPy), or through an
+    inverted index of the sparse vectors when NumPy is not installed.
+    """
+
+    def __init__(self, names):
+        self.size = len(names)
+        self.vocabulary = {}
+        vectors = [self._encode(name, grow=True) for name in names]
+
+        if np is not None:
+            self.matrix = np.zeros((self.size, max(1, len(self.vocabulary))), dtype=np.float32)
+            for row, vector in enumerate(vectors):
+                for col, weight in vector.items():
+                    self.matrix[row, col] = weight
+        else:
+            self.postings = {}
+            for row, vector in enumerate(vectors):
+                for col, weight in vector.items():
+                    self.postings.setdefault(col, []).append((row, weight))
+
+    def _encode(self, name, grow=False):
+        profile = ngram_profile(name)
+        norm = math.sqrt(sum(c * c for c in profile.values()))
+        vector = {}
+        for gram, count in profile.items():
+            col = self.vocabulary.get(gram)
+            if col is None:
+                if not grow:
+                    # Unknown grams cannot match anything but still count in the norm
+                    continue
+                col = self.vocabulary[gram] = len(self.vocabulary)
+            vector[col] = count / norm
+        return vector
+
+    def similarity_matrix(self, query_names):
+        """
+        Returns a len(query_names) x len(names) matrix of cosine similarities
+        (ndarray with NumPy, list of lists otherwise).
+        """
+        queries = [self._encode(name) for name in query_names]
+
+        if np is not None:
+            encoded = np.zeros((len(queries), self.matrix.shape[1]), dtype=np.float32)
+            for row, vector in enumerate(queries):
+                for col, weight in vector.items():
+                    encoded[row, col] = weight
+            return encoded @ self.matrix.T
+
+        result = []
+        for vector in queries:
+            scores = [0.0] * self.size
+            for col, weight in vector.items():
+                for row, other in self.postings.get(col, ()):
+                    scores[row] += weight * other
+            result.append(scores)
+        return result
+
+class CandidateIndex:
+    """
+    Blocking index over RunningLife events.
+    Normalizes every name and parses every date once, and buckets events by date
+    and by name bigram so a roadrun event is only scored against plausible candidates:
+    everything within ±DATE_WINDOW_DAYS plus everything sharing a distinctive bigram.
+    Bigrams that occur in a large share of names (e.g. '마라', '라톤') are not used as keys.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.normalized = {}
+        self.dates = {}
+        self.by_date = {}
+        self.by_gram = {}
+
+        for pos, event in enumerate(events):
+            if not event.get('name'):
+                continue
+            normalized = normalize_event_name(event['name'])
+            self.normalized[pos] = normalized
+
+            event_date = parse_event_date(event.get('date'))
+            self.dates[pos] = event_date
+            if event_date:
+                self.by_date.setdefault(event_date.toordinal(), []).append(pos)
+
+            for gram in name_ngrams(normalized):
+                self.by_gram.setdefault(gram, []).append(pos)
+
+        max_bucket = max(20, len(self.normalized) // 4)
+        self.by_gram = {g: ps for g, ps in self.by_gram.items() if len(ps) <= max_bucket}
+        self._ngram_scorer = None
+        self._positions = sorted(self.normalized)
+
+    def ngram_similarities(self, query_names):
+        """
+        Cosine n-gram similarities of query names against all indexed events.
+        Returns (positions, matrix) where matrix column j belongs to events[positions[j]].
+        """
+        if self._ngram_scorer is None:
+            self._ngram_scorer = NgramScorer([self.normalized[pos] for pos in self._positions])
+        return self._positions, self._ngram_scorer.similarity_matrix(query_names)
+
+    def candidates(self, normalized, event_date):
+        """
+        Returns candidate positions in list order (so ties resolve like a full scan).
+        """
+        positions = set()
+        if event_date:
+            ordinal = event_date.toordinal()
+            for delta in range(-DATE_WINDOW_DAYS, DATE_WINDOW_DAYS + 1):
+                positions.update(self.by_date.get(ordinal + delta, ()))
+        for gram in name_ngrams(normalized):
+            positions.update(self.by_gram.get(gram, ()))
+        return sorted(positions)
+
+def _date_boost(date1, date2):
+    # Boost score if dates are within 3 days
+    if date1 and date2 and abs((date1 - date2).days) <= DATE_WINDOW_DAYS:
+        return DATE_BOOST
+    return 0
+
+def _match_sequence(roadrun_normalized, roadrun_date, index):
+    best_pos = None
+    best_score = 0
     
-    # Remove year prefixes (2026, 제22회, etc.)
-    normalized = re.sub(r'^\d{4}\s*', '', normalized)
-    normalized = re.sub(r'^제\s*\d+회\s*', '', normalized)
+    for pos in index.candidates(roadrun_normalized, roadrun_date):
+        boost = _date_boost(roadrun_date, index.dates[pos])
+
+        matcher = SequenceMatcher(None, roadrun_normalized, index.normalized[pos])
+        # Cheap upper bounds first: skip candidates that cannot beat the current best
+        if matcher.real_quick_ratio() + boost <= best_score or matcher.quick_ratio() + boost <= best_score:
+            continue
+        score = matcher.ratio() + boost
+        
+        if score > best_score:
+            best_score = score
+            best_pos = pos
     
-    # Remove special characters except Korean, English, numbers
-    normalized = re.sub(r'[^\w\s가-힣]', ' ', normalized)
+    return best_pos, best_score
+
+def _match_ngram(roadrun_date, index, positions, similarities):
+    best_pos = None
+    best_score = 0
     
-    # Remove extra whitespace
-    normalized = ' '.join(normalized.split())
+    for pos, similarity in zip(positions, similarities):
+        score = float(similarity) + _date_boost(roadrun_date, index.dates[pos])
+        if score > best_score:
+            best_score = score
+            best_pos = pos
     
-    return normalized
+    return best_pos, best_score
 
-def calculate_similarity(str1, str2):
+def _candidate_scores(roadrun_normalized, roadrun_date, index, scorer, similarities=None):
     """
-    Calculate similarity ratio between two strings using SequenceMatcher.
-    Returns a value between 0 and 1.
+    Yields (position, score) for every candidate of one roadrun event.
     """
-    return SequenceMatcher(None, str1, str2).ratio()
+    if scorer == 'ngram':
+        for pos, similarity in zip(index._positions, similarities):
+            yield pos, float(similarity) + _date_boost(roadrun_date, index.dates[pos])
+    elif scorer == 'sequence':
+        for pos in index.candidates(roadrun_normalized, roadrun_date):
+            ratio = SequenceMatcher(None, roadrun_normalized, index.normalized[pos]).ratio()
+            yield pos, ratio + _date_boost(roadrun_date, index.dates[pos])
+    else:
+        raise ValueError(f"Unknown scorer: {scorer}")
+
+def assign_matches(roadrun_events, runninglife_events, threshold=0.6, scorer='sequence', index=None):
+    """
+    One-to-one matching of roadrun events to RunningLife events.
+    Builds the candidate score matrix once (only pairs >= threshold are kept), then
+    assigns pairs greedily by global score: highest score first, ties broken by
+    roadrun order and then RunningLife order. No RunningLife event is claimed twice.
+    Returns {roadrun_index: (runninglife_event, score)}.
+    """
+    if index is None:
+        index = CandidateIndex(runninglife_events)
+
+    normalized_names = [normalize_event_name(e.get('name')) for e in roadrun_events]
+    similarity_rows = None
+    if scorer == 'ngram':
+        _, similarity_rows = index.ngram_similarities(normalized_names)
+
+    pairs = []
+    for row, rr_event in enumerate(roadrun_events):
+        if not rr_event.get('name'):
+            continue
+        roadrun_date = parse_event_date(rr_event.get('date'))
+        similarities = similarity_rows[row] if similarity_rows is not None else None
+        for pos, score in _candidate_scores(normalized_names[row], roadrun_date, index, scorer, similarities):
+            if score >= threshold:
+                pairs.append((-score, row, pos))
+
+    pairs.sort()
+    assignments = {}
+    claimed = set()
+    for neg_score, row, pos in pairs:
+        if row in assignments or pos in claimed:
+            continue
+        assignments[row] = (index.events[pos], -neg_score)
+        claimed.add(pos)
+
+    return assignments
 
-def match_events(roadrun_event, runninglife_events, threshold=0.6):
+def match_events(roadrun_event, runninglife_events, threshold=0.6, index=None, scorer='sequence', similarities=None):
     """
     Find matching event from runninglife_events for a given roadrun_event.
+    Pass a CandidateIndex built once over runninglife_events when matching many events.
+    scorer='sequence' compares blocked candidates with difflib.SequenceMatcher;
+    scorer='ngram' uses n-gram cosine similarity against every event
+    (`similarities` may carry this event's precomputed row from CandidateIndex.ngram_similarities).
     Returns the best match if similarity > threshold, None otherwise.
     """
     if not roadrun_event.get('name'):
         return None
     
+    if index is None:
+        index = CandidateIndex(runninglife_events)
+
     roadrun_normalized = normalize_event_name(roadrun_event['name'])
-    best_match = None
-    best_score = 0
+    roadrun_date = parse_event_date(roadrun_event.get('date'))
     
-    for rl_event in runninglife_events:
-        if not rl_event.get('name'):
-            continue
-        
-        rl_normalized = normalize_event_name(rl_event['name'])
-        score = calculate_similarity(roadrun_normalized, rl_normalized)
-        
-        # Also check date proximity if both have dates
-        if roadrun_event.get('date') and rl_event.get('date'):
-            try:
-                date1 = datetime.datetime.strptime(roadrun_event['date'], '%Y-%m-%d').date()
-                date2 = datetime.datetime.strptime(rl_event['date'], '%Y-%m-%d').date()
-                days_diff = abs((date1 - date2).days)
-                
-                # Boost score if dates are within 3 days
-                if days_diff <= 3:
-                    score += 0.2
-            except:
-                pass
-        
-        if score > best_score:
-            best_score = score
-            best_match = rl_event
+    if scorer == 'ngram':
+        if similarities is None:
+            positions, matrix = index.ngram_similarities([roadrun_normalized])
+            similarities = matrix[0]
+        else:
+            positions = index._positions
+        best_pos, best_score = _match_ngram(roadrun_date, index, positions, similarities)
+    elif scorer == 'sequence':
+        best_pos, best_score = _match_sequence(roadrun_normalized, roadrun_date, index)
+    else:
+        raise ValueError(f"Unknown scorer: {scorer}")
     
-    if best_score >= threshold:
-        return best_match, best_score
+    if best_pos is not None and best_score >= threshold:
+        return index.events[best_pos], best_score
     
     return None
 
-def cross_validate_events(roadrun_events, runninglife_events):
+def cross_validate_events(roadrun_events, runninglife_events, scorer='sequence', assignment='global'):
     """
     Cross-validate and enrich event data from both sources.
+    scorer selects the name similarity engine (see match_events).
+    assignment='global' matches one-to-one via assign_matches;
+    assignment='greedy' lets each roadrun event take its own best match (a RunningLife
+    event may then be claimed more than once).
     Returns a list of enriched events with validation status.
     """
     validated_events = []
     matched_rl_ids = set()
+    index = CandidateIndex(runninglife_events)
+    
+    assignments = None
+    if assignment == 'global':
+        assignments = assign_matches(roadrun_events, runninglife_events, scorer=scorer, index=index)
+    elif assignment != 'greedy':
+        raise ValueError(f"Unknown assignment: {assignment}")
+    
+    similarity_rows = None
+    if scorer == 'ngram' and assignments is None:
+        # One matrix pass for all roadrun x RunningLife pairs
+        _, similarity_rows = index.ngram_similarities(
+            [normalize_event_name(e.get('name')) for e in roadrun_events]
+        )
     
-    for rr_event in roadrun_events:
+    for row, rr_event in enumerate(roadrun_events):
         enriched_event = rr_event.copy()
         enriched_event['validation'] = {
             'source': 'roadrun',
@@ -99,7 +326,13 @@ def cross_validate_events(roadrun_events, runninglife_events):
         }
         
         # Try to find matching event in runninglife
-        match_result = match_events(rr_event, runninglife_events)
+        if assignments is not None:
+            match_result = assignments.get(row)
+        else:
+            match_result = match_events(
+                rr_event, runninglife_events, index=index, scorer=scorer,
+                similarities=similarity_rows[row] if similarity_rows is not None else None
+            )
         
         if match_result:
             rl_event, score = match_result
@@ -148,6 +381,135 @@ def cross_validate_events(roadrun_events, runninglife_events):
     
     return validated_events
 
+# Fields merged across sources, with the keys each source may use for them
+RECONCILED_FIELDS = {
+    'name': ('name',),
+    'date': ('date',),
+    'location': ('location',),
+    'registration_status': ('registration_status', 'status'),
+    'organizer': ('organizer',),
+    'link': ('link',),
+}
+
+def _field_value(event, field):
+    for key in RECONCILED_FIELDS[field]:
+        value = event.get(key)
+        if value:
+            return value
+    return None
+
+def _source_label(source_names, primary_source):
+    if len(source_names) >= 3:
+        return 'multiple'
+    if len(source_names) == 2:
+        return 'both'
+    if source_names[0] == primary_source:
+        return primary_source
+    return f"{source_names[0]}_only"
+
+def _merge_cluster(cluster, primary_source):
+    members = cluster['members']  # [(source_name, event, score)] in source priority order
+    source_names = [name for name, _, _ in members]
+    first_source, first_event, _ = members[0]
+
+    if first_source == primary_source:
+        merged = first_event.copy()
+    else:
+        # Same shape as the RunningLife-only records: no roadrun link or detail data
+        merged = {
+            'name': first_event.get('name'),
+            'date': first_event.get('date'),
+            'location': first_event.get('location'),
+            'registration_status': _field_value(first_event, 'registration_status'),
+            'link': None,
+            'registration_period': None,
+        }
+
+    field_sources = {}
+    field_confidence = {}
+    for field in RECONCILED_FIELDS:
+        provided = [(name, _field_value(event, field)) for name, event, _ in members]
+        provided = [(name, value) for name, value in provided if value]
+        if not provided:
+            continue
+        # First source in priority order wins
+        chosen_source, chosen_value = provided[0]
+        if not merged.get(field):
+            merged[field] = chosen_value
+            if field == 'location' and chosen_source != first_source:
+                merged['location_source'] = chosen_source
+        field_sources[field] = chosen_source
+
+        distinct = {str(value).strip() for _, value in provided}
+        if len(provided) == 1:
+            field_confidence[field] = 'medium'
+        elif len(distinct) == 1:
+            field_confidence[field] = 'high'
+        else:
+            field_confidence[field] = 'low'
+
+    # Keep each secondary source's date for comparison (e.g. date_runninglife)
+    for name, event, _ in members[1:]:
+        if event.get('date'):
+            merged[f'date_{name}'] = event['date']
+
+    scores = [score for _, _, score in members[1:]]
+    match_score = min(scores) if scores else 0
+    if len(members) > 1:
+        confidence = 'high' if match_score > 0.8 else 'medium'
+    else:
+        confidence = 'low' if first_source == primary_source else 'medium'
+
+    merged['validation'] = {
+        'source': _source_label(source_names, primary_source),
+        'sources': source_names,
+        'cross_validated': len(members) > 1,
+        'confidence': confidence,
+        'match_score': round(match_score, 2),
+        'field_sources': field_sources,
+        'field_confidence': field_confidence,
+    }
+    return merged
+
+def reconcile_events(events_by_source, threshold=0.6, scorer='sequence'):
+    """
+    Merges events from any number of sources into entity clusters.
+    events_by_source maps source name -> event list, in priority order (the first
+    source is primary, e.g. roadrun). Sources are folded in one at a time: each new
+    source is matched one-to-one against the existing clusters with assign_matches,
+    so every added source costs one blocked matching pass rather than a pass per pair
+    of sources. Unmatched events start new clusters.
+    Returns merged events with per-field provenance ('field_sources') and confidence
+    ('field_confidence') in their 'validation' dict.
+    """
+    source_names = list(events_by_source)
+    if not source_names:
+        return []
+    primary_source = source_names[0]
+
+    clusters = []
+    for source_name in source_names:
+        events = [e for e in events_by_source[source_name] or [] if e.get('name')]
+        if not events:
+            continue
+
+        assignments = {}
+        if clusters:
+            # Each cluster is represented by its highest-priority member
+            representatives = [cluster['members'][0][1] for cluster in clusters]
+            assignments = assign_matches(representatives, events, threshold=threshold, scorer=scorer)
+
+        matched = set()
+        for row, (event, score) in assignments.items():
+            clusters[row]['members'].append((source_name, event, score))
+            matched.add(id(event))
+
+        for event in events:
+            if id(event) not in matched:
+                clusters.append({'members': [(source_name, event, 0)]})
+
+    return [_merge_cluster(cluster, primary_source) for cluster in clusters]
+
 def get_validation_summary(validated_events):
     """
     Generate a summary of validation results.
@@ -1,43 +1,298 @@
+import hashlib
 import json
 import os
+import sqlite3
+import tempfile
+from contextlib import closing
 
-DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'events.json')
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+DATA_FILE = os.path.join(DATA_DIR, 'events.json')
+DB_FILE = os.path.join(DATA_DIR, 'events.db')
 
-def load_stored_events():
-    if not os.path.exists(DATA_FILE):
-        return {}
+# 'sqlite' (default) or 'json' for the legacy whole-file store
+STORE_BACKEND = os.getenv('EVENT_STORE', 'sqlite')
+
+# Fields to monitor for changes
+MONITORED_FIELDS = {
+    'location': 'Location',
+    'link': 'Link',
+    'registration_status': 'Status',
+    'organizer': 'Organizer',
+    'date': 'Date'
+}
+
+def event_key(event):
+    # We use (Date + Name) as a unique key for simplicity
+    return f"{event['date']}_{event['name']}"
+
+def field_digest(event):
+    """
+    Digest of the monitored fields an event provides (stripped, empty ones skipped).
+    Equal digests mean detect_changes would find no change, so it can skip the field diff.
+    """
+    parts = []
+    for field in MONITORED_FIELDS:
+        value = event.get(field)
+        if value:
+            parts.append(f"{field}={str(value).strip()}")
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class JsonBackend:
+    """Legacy store: the whole dict in one JSON file, rewritten on every save."""
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self._count = None
+
+    def load(self, keys=None):
+        events = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    events = json.load(f)
+            except json.JSONDecodeError:
+                events = {}
+        self._count = len(events)
+        if keys is None:
+            return events
+        return {key: events[key] for key in keys if key in events}
+
+    def count(self):
+        # The whole file is read on every load anyway, so reuse its size
+        if self._count is None:
+            self.load()
+        return self._count
+
+    def upsert(self, events_dict):
+        events = self.load()
+        events.update(events_dict)
+        self.replace(events)
+
+    def replace(self, events_dict):
+        # Write to a temp file and rename over the old one, so a crash never leaves a half-written store
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.events-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(events_dict, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._count = len(events_dict)
+
+class SqliteBackend:
+    """
+    One row per event (key -> JSON document) in SQLite, indexed on key and date.
+    Reads can be limited to the keys a run needs and writes only touch changed rows.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            key TEXT PRIMARY KEY,
+            date TEXT,
+            name TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_events_date ON events(date);
+    """
+
+    def __init__(self, path=DB_FILE, json_path=DATA_FILE):
+        self.path = path
+        self.json_path = json_path
+        self._ready = False
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self._ready:
+            conn.executescript(self.SCHEMA)
+            self._ready = True
+            # Carry over the legacy JSON store the first time the database is used
+            empty = conn.execute("SELECT 1 FROM events LIMIT 1").fetchone() is None
+            if empty and self.json_path and os.path.exists(self.json_path):
+                count = self._write(conn, JsonBackend(self.json_path).load())
+                print(f"Imported {count} events from {self.json_path} into {self.path}")
+        return conn
+
+    def _write(self, conn, events_dict):
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (key, date, name, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET date = excluded.date, name = excluded.name, data = excluded.data",
+                [
+                    (key, event.get('date'), event.get('name'), json.dumps(event, ensure_ascii=False))
+                    for key, event in events_dict.items()
+                ],
+            )
+        return len(events_dict)
+
+    def load(self, keys=None):
+        with closing(self._connect()) as conn:
+            if keys is None:
+                rows = conn.execute("SELECT key, data FROM events").fetchall()
+            else:
+                keys = list(keys)
+                rows = []
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(conn.execute(
+                        f"SELECT key, data FROM events WHERE key IN ({placeholders})", chunk
+                    ).fetchall())
+        return {key: json.loads(data) for key, data in rows}
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def load_between(self, start_date, end_date):
+        """Events whose date falls in [start_date, end_date] (YYYY-MM-DD), via the date index."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT key, data FROM events WHERE date BETWEEN ? AND ? ORDER BY date",
+                (start_date, end_date),
+            ).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def upsert(self, events_dict):
+        with closing(self._connect()) as conn:
+            self._write(conn, events_dict)
+
+    def replace(self, events_dict):
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM events")
+            self._write(conn, events_dict)
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = JsonBackend() if STORE_BACKEND == 'json' else SqliteBackend()
+    return _backend
+
+def load_stored_events(keys=None):
+    """
+    Returns {key: event}. With `keys`, only those events are read.
+    """
+    return get_backend().load(keys)
+
+def save_events(events_dict):
+    """
+    Writes the given events. Keys not in events_dict are kept, so callers
+    can pass just the events they changed.
+    """
+    for event in events_dict.values():
+        event['field_digest'] = field_digest(event)
+    get_backend().upsert(events_dict)
+
+class EventStore:
+    """
+    The stored events for one run: loaded once, modified in memory, written once.
+    Changed keys are tracked and flush() writes only those, in a single atomic step
+    (one SQLite transaction, or temp file + rename for the JSON backend).
+    Pass `keys` to load only the events the run will look at.
+    """
+
+    def __init__(self, keys=None, backend=None):
+        self.backend = backend or get_backend()
+        self.events = self.backend.load(keys)
+        self.is_empty = not self.events if keys is None else self.backend.count() == 0
+        self.dirty = set()
+
+    def __contains__(self, key):
+        return key in self.events
+
+    def __len__(self):
+        return len(self.events)
+
+    def get(self, key, default=None):
+        return self.events.get(key, default)
+
+    def put(self, event, key=None):
+        """
+        Merges event into the stored one (keeping fields the event lacks) and marks it dirty.
+        """
+        key = key or event_key(event)
+        if key in self.events:
+            self.events[key].update(event)
+        else:
+            self.events[key] = event
+        stored = self.events[key]
+        stored['field_digest'] = field_digest(stored)
+        self.dirty.add(key)
+        return stored
+
+    def flush(self):
+        if not self.dirty:
+            return 0
+        count = len(self.dirty)
+        self.backend.upsert({key: self.events[key] for key in self.dirty})
+        self.dirty.clear()
+        return count
+
+def load_known_rows(stored_events=None):
+    """
+    Maps each stored event's list-row fingerprint to the list fields it was built from,
+    for scraper.parse_schedule_html(known_rows=...). Returns {} if the store cannot be read.
+    """
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        if stored_events is None:
+            stored_events = load_stored_events()
+    except Exception as e:
+        print(f"Could not load known list rows: {e}")
         return {}
+    return {
+        event['row_fingerprint']: event['list_row']
+        for event in stored_events.values()
+        if event.get('row_fingerprint') and event.get('list_row')
+    }
 
-def save_events(events_dict):
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(events_dict, f, ensure_ascii=False, indent=4)
+def import_json_events(json_path=DATA_FILE, db_path=DB_FILE):
+    """
+    One-shot import of the legacy events.json into the SQLite store.
+    Returns the number of imported events.
+    """
+    events = JsonBackend(json_path).load()
+    SqliteBackend(db_path, json_path=None).upsert(events)
+    return len(events)
+
+# Refreshed on every scrape; a new value alone is not worth a write
+VOLATILE_FIELDS = ('scraped_at',)
+
+def _unmonitored_changes(event, stored):
+    # Monitored fields are already covered by the digest
+    return any(stored.get(field) != value for field, value in event.items()
+               if field not in MONITORED_FIELDS and field not in VOLATILE_FIELDS)
 
-def detect_changes(scraped_events):
+def detect_changes(scraped_events, store=None):
     """
     Compares scraped events with stored events.
+    The scraped data is merged into `store`; the caller flushes it. Without a store,
+    one is opened for the scraped keys and flushed before returning.
     Returns:
         new_events: list of events that are completely new
         updated_events: list of events that existed but changed details (location, status, link)
     """
-    stored_events = load_stored_events()
-    
-    new_events = []
-    updated_events = []
-    
     # We use (Date + Name) as a unique key for simplicity
     # Ideally, we'd have a unique ID from the site, but text scraping is brittle.
+    scraped_events_map = {event_key(event): event for event in scraped_events}
+
+    owns_store = store is None
+    if owns_store:
+        # Only the scraped keys are read from the store
+        store = EventStore(scraped_events_map.keys())
+    stored_events = store.events
     
-    scraped_events_map = {}
+    new_events = []
+    updated_events = []
+    unchanged_keys = set()
     
-    for event in scraped_events:
-        # Create a unique key
-        key = f"{event['date']}_{event['name']}"
-        scraped_events_map[key] = event
+    for key, event in scraped_events_map.items():
         
         if key not in stored_events:
             event['data_status'] = 'new'
@@ -45,23 +300,23 @@ def detect_changes(scraped_events):
         else:
             # Check for changes in existing event
             stored = stored_events[key]
+
+            # Fast path: same monitored fields as last time (most rows on every run).
+            if field_digest(event) == (stored.get('field_digest') or field_digest(stored)):
+                # Written back only for events saved before digests existed (so they get one)
+                # or when an unmonitored field (validation, location_source, ...) changed
+                if 'field_digest' in stored and not _unmonitored_changes(event, stored):
+                    unchanged_keys.add(key)
+                continue
+
             changed = False
             changes = []
             
-            # Fields to monitor for changes
             # Note: We compare only if the new scrape *provides* the data.
             # If new scrape is missing data (e.g. sparse list), we assume old rich data is still valid,
             # UNLESS it's a field that should be in the list (location, date, etc).
             
-            common_fields = {
-                'location': 'Location',
-                'link': 'Link',
-                'registration_status': 'Status',
-                'organizer': 'Organizer',
-                'date': 'Date'
-            }
-            
-            for field, label in common_fields.items():
+            for field, label in MONITORED_FIELDS.items():
                 if field in event and event[field]:
                     # Normalize comparison (strip whitespace)
                     val_new = str(event[field]).strip()
@@ -77,16 +332,15 @@ def detect_changes(scraped_events):
                 updated_events.append(event)
 
     # Update stored events
-    # We update stored with new values.
+    # We update stored with new values (rows with nothing new to store are skipped).
     # CRITICAL: We must preserve existing keys in stored_events that are NOT in scraped_events (like 'category', 'description' from detail fetch)
     
     for key, event in scraped_events_map.items():
-        if key in stored_events:
-            stored_events[key].update(event)
-        else:
-            stored_events[key] = event
+        if key not in unchanged_keys:
+            store.put(event, key)
             
-    save_events(stored_events)
+    if owns_store:
+        store.flush()
     
     return new_events, updated_events
 
@@ -0,0 +1,83 @@
+"""
+Shared HTTP layer for the scrapers.
+Serves fresh pages from the on-disk response cache, reuses pooled keep-alive
+connections and revalidates stale pages with ETag / Last-Modified,
+so unchanged pages come back as cheap 304 responses.
+"""
+
+import atexit
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from response_cache import ResponseCache
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session, creating it on first use.
+    The pool is sized for the concurrent detail fetcher.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({'User-Agent': USER_AGENT})
+            _session = session
+        return _session
+
+
+_cache = ResponseCache()
+atexit.register(_cache.flush)
+
+
+def fetch_text(url, encoding=None, timeout=10, source=None, session=None, cache=None, revalidate=False,
+               limiter=None):
+    """
+    GETs url through the shared session and returns the decoded body.
+    A cached body younger than the TTL of `source` is returned without a request,
+    unless `revalidate` is set (the page is known to have changed). Otherwise
+    If-None-Match / If-Modified-Since are sent when validators are stored,
+    and the cached body is served on 304 Not Modified.
+    `limiter` (a rate_limiter.HostRateLimiter) paces requests that go to the network;
+    cache hits do not wait for it.
+    """
+    session = session or get_session()
+    cache = cache or _cache
+
+    entry, cached_body = cache.get(url)
+    if not revalidate and cache.is_fresh(entry, source):
+        return cached_body
+
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    if limiter is not None:
+        limiter.acquire(urlparse(url).netloc)
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached_body is not None:
+        cache.touch(url)
+        return cached_body
+
+    if encoding:
+        response.encoding = encoding
+    text = response.text
+
+    if response.status_code == 200:
+        cache.put(url, text, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+
+    return text
@@ -3,10 +3,11 @@ Migration script to backfill '교차검증여부' for existing Notion records
 """
 
 import os
-from notion_client import Client
 from dotenv import load_dotenv
 from scraper_runninglife import fetch_runninglife_schedule
-from cross_validator import normalize_event_name, calculate_similarity
+from normalization import normalize_event_name
+from cross_validator import calculate_similarity
+from notion_manager import get_client, iter_database_pages
 import time
 
 load_dotenv()
@@ -17,7 +18,7 @@ def migrate_cross_validation_status():
     """
     Backfill cross-validation status for all existing Notion records
     """
-    client = Client(auth=API_KEY)
+    client = get_client(API_KEY)
     
     print("=" * 60)
     print("CROSS-VALIDATION STATUS MIGRATION")
@@ -32,35 +33,21 @@ def migrate_cross_validation_status():
         print("      ERROR: No data from runninglife. Cannot proceed.")
         return
     
-    # 2. Fetch all existing Notion pages
-    print("\n[2/4] Fetching all existing Notion records...")
-    all_pages = []
-    has_more = True
-    next_cursor = None
-    
-    while has_more:
-        try:
-            time.sleep(0.2)
-            response = client.search(
-                filter={"property": "object", "value": "page"},
-                start_cursor=next_cursor,
-                page_size=50
-            )
-            
-            # Add all results (filtering happens later)
-            all_pages.extend(response.get('results', []))
-            
-            has_more = response.get('has_more', False)
-            next_cursor = response.get('next_cursor')
-            
-            if len(all_pages) > 200:  # Safety limit
-                break
-            
-        except Exception as e:
-            print(f"      Error fetching pages: {e}")
-            break
-    
-    print(f"      Found {len(all_pages)} total pages from search")
+    # 2. Collect AI-generated Notion records that are not validated yet.
+    # Collected before updating: setting 교차검증여부 drops pages out of the filter,
+    # which would shift the cursor and skip pages if we updated while paging.
+    print("\n[2/4] Querying AI-generated records without cross-validation...")
+    try:
+        pages = list(iter_database_pages(client, DB_ID, filter={
+            "and": [
+                {"property": "AI자동생성여부", "select": {"equals": "Y"}},
+                {"property": "교차검증여부", "select": {"does_not_equal": "Y"}},
+            ]
+        }))
+    except Exception as e:
+        print(f"      Error querying pages: {e}")
+        return
+    print(f"      Found {len(pages)} records to check")
     
     # 3. Process and update each page
     print("\n[3/4] Cross-validating and updating records...")
@@ -68,62 +55,33 @@ def migrate_cross_validation_status():
     skipped_count = 0
     error_count = 0
     
-    for idx, page in enumerate(all_pages, 1):
+    for idx, page in enumerate(pages, 1):
         try:
             page_id = page['id']
             props = page.get('properties', {})
-            
+        
             # Get event name
             event_name = ""
             if '대회명' in props and props['대회명']['type'] == 'title':
                 titles = props['대회명'].get('title', [])
                 if titles:
                     event_name = titles[0].get('plain_text', '')
-            
+        
             if not event_name:
                 skipped_count += 1
                 continue
-            
-            # Check AI자동생성여부 - Only process if 'Y'
-            ai_auto_gen = False
-            if 'AI자동생성여부' in props:
-                select_prop = props['AI자동생성여부'].get('select')
-                if select_prop and select_prop.get('name') == 'Y':
-                    ai_auto_gen = True
-            
-            if not ai_auto_gen:
-                print(f"  [{idx}/{len(all_pages)}] {event_name[:40]}... (not AI-generated, skip)")
-                skipped_count += 1
-                continue
-            
-            # Check if already has cross-validation flag
-            has_flag = False
-            if '교차검증여부' in props:
-                select_prop = props['교차검증여부'].get('select')
-                if select_prop and select_prop.get('name') == 'Y':
-                    has_flag = True
-            
-            if has_flag:
-                print(f"  [{idx}/{len(all_pages)}] {event_name[:40]}... (already validated)")
-                skipped_count += 1
-                continue
-            
+        
             # Try to match with runninglife events
             normalized_name = normalize_event_name(event_name)
-            best_match = None
             best_score = 0
-            
+        
             for rl_event in runninglife_events:
                 if not rl_event.get('name'):
                     continue
-                
-                rl_normalized = normalize_event_name(rl_event['name'])
-                score = calculate_similarity(normalized_name, rl_normalized)
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = rl_event
             
+                rl_normalized = normalize_event_name(rl_event['name'])
+                best_score = max(best_score, calculate_similarity(normalized_name, rl_normalized))
+        
             # Update if good match found (threshold: 0.6)
             if best_score >= 0.6:
                 update_payload = {
@@ -131,26 +89,26 @@ def migrate_cross_validation_status():
                         "교차검증여부": {"select": {"name": "Y"}}
                     }
                 }
-                
+            
                 client.pages.update(page_id=page_id, **update_payload)
-                print(f"  [{idx}/{len(all_pages)}] ✓ {event_name[:40]}... (score: {best_score:.2f})")
+                print(f"  [{idx}] ✓ {event_name[:40]}... (score: {best_score:.2f})")
                 updated_count += 1
-                time.sleep(0.3)  # Rate limiting
             else:
-                print(f"  [{idx}/{len(all_pages)}] - {event_name[:40]}... (no match)")
+                print(f"  [{idx}] - {event_name[:40]}... (no match)")
                 skipped_count += 1
-                
+            
         except Exception as e:
-            print(f"  [{idx}/{len(all_pages)}] ✗ Error: {e}")
+            print(f"  [{idx}] ✗ Error: {e}")
             error_count += 1
             continue
     
     # 4. Summary
     print("\n[4/4] Migration Summary:")
-    print(f"      Total records: {len(all_pages)}")
+    print(f"      Total records: {len(pages)}")
     print(f"      Updated: {updated_count}")
     print(f"      Skipped: {skipped_count}")
     print(f"      Errors: {error_count}")
+    print(f"      {client.stats_summary()}")
     print("=" * 60)
     
     if updated_count > 0:
@@ -0,0 +1,14 @@
+import sys
+from data_manager import DATA_FILE, DB_FILE, import_json_events
+
+# Fix encoding for Windows
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+
+def migrate(json_path=DATA_FILE, db_path=DB_FILE):
+    print(f"Importing {json_path} into {db_path}...")
+    count = import_json_events(json_path, db_path)
+    print(f"Migration complete. Imported: {count} events")
+
+if __name__ == "__main__":
+    migrate(*sys.argv[1:3])
@@ -1,11 +1,8 @@
 import os
-import datetime
-import re
-import time
 import sys
-import calendar
-from notion_client import Client
 from dotenv import load_dotenv
+from normalization import parse_registration_period_robust
+from notion_manager import get_client, iter_database_pages
 
 # Force unbuffered output
 sys.stdout.reconfigure(line_buffering=True)
@@ -16,110 +13,28 @@ API_KEY = os.getenv("NOTION_API_KEY")
 DB_ID = os.getenv("NOTION_DATABASE_ID")
 print(f"Loaded Env. Key present: {bool(API_KEY)}", flush=True)
 
-def clamp_date(year, month, day):
-    """
-    Adjusts day to be valid for the given month/year.
-    e.g. 2026-04-31 -> 2026-04-30
-    """
-    try:
-        # Check standard validity first
-        datetime.date(year, month, day)
-        return year, month, day
-    except ValueError:
-        # Likely day is out of range
-        last_day = calendar.monthrange(year, month)[1]
-        clamped_day = min(day, last_day)
-        print(f"Warning: Clamped date {year}-{month}-{day} to {year}-{month}-{clamped_day}")
-        return year, month, clamped_day
-
-def parse_date_robust(date_str):
-    if not date_str:
-        return None
-    
-    date_str = date_str.strip()
-    
-    # Try YYYY.MM.DD
-    try:
-        dt = datetime.datetime.strptime(date_str, "%Y.%m.%d").date()
-        return dt.isoformat()
-    except ValueError:
-        pass
-        
-    # Try YYYY년MM월DD일 (Korean format) with Regex to capture parts for clamping
-    clean_str = date_str.replace(" ", "")
-    try:
-        match = re.match(r"(\d{4})년(\d{1,2})월(\d{1,2})일", clean_str)
-        if match:
-            y, m, d =  map(int, match.groups())
-            y, m, d = clamp_date(y, m, d)
-            return f"{y}-{m:02d}-{d:02d}"
-    except Exception:
-        pass
-        
-    # Regex for YYYY.MM.DD style but invalid days?
-    try:
-        match = re.search(r"(\d{4})\.(\d{1,2})\.(\d{1,2})", date_str)
-        if match:
-             y, m, d =  map(int, match.groups())
-             y, m, d = clamp_date(y, m, d)
-             return f"{y}-{m:02d}-{d:02d}"
-    except Exception:
-        pass
-
-    return None
-
-def parse_registration_period_robust(reg_str):
-    if not reg_str:
-        return None, None
-        
-    if '~' not in reg_str:
-        return None, None
-        
-    parts = reg_str.split('~')
-    start_str = parts[0].strip()
-    end_str = parts[1].strip()
-    
-    start_date = parse_date_robust(start_str)
-    end_date = parse_date_robust(end_str)
-    
-    return start_date, end_date
-
 def migrate_dates():
     print("Initializing Client...", flush=True)
     try:
-        client = Client(auth=API_KEY)
+        client = get_client(API_KEY)
     except Exception as e:
         print(f"Client init failed: {e}", flush=True)
         return
 
     print("Starting Migration of Existing Records...", flush=True)
-    print("Searching for pages...", flush=True)
+    print("Querying pages with a registration period...", flush=True)
     
-    has_more = True
-    next_cursor = None
     processed_count = 0
     updated_count = 0
     
-    while has_more:
-        try:
-            time.sleep(0.2)
-            resp = client.search(
-                filter={"property": "object", "value": "page"},
-                start_cursor=next_cursor,
-                page_size=50
-            )
-        except Exception as e:
-            print(f"\nSearch failed: {e}", flush=True)
-            break
-            
-        print(f"\nFetched {len(resp['results'])} items.", flush=True)
-        
-        for page in resp['results']:
+    try:
+        pages = iter_database_pages(
+            client, DB_ID,
+            filter={"property": "(예상) 접수 시기", "rich_text": {"is_not_empty": True}}
+        )
+        for page in pages:
             props = page.get('properties', {})
             
-            if "(예상) 접수 시기" not in props:
-                continue
-                
             page_id = page['id']
             page_title = "Unknown"
             
@@ -170,14 +85,11 @@ def migrate_dates():
                     print(f"Failed to update {page_title}: {e}", flush=True)
             
             processed_count += 1
-            
-        has_more = resp.get('has_more', False)
-        next_cursor = resp.get('next_cursor')
-        if processed_count > 200: 
-            print("\nReached 200 items limit. Stopping.", flush=True)
-            break
+    except Exception as e:
+        print(f"\nQuery failed: {e}", flush=True)
 
     print(f"\nMigration Complete. Processed {processed_count} relevant pages. Updated {updated_count} pages.", flush=True)
+    print(client.stats_summary(), flush=True)
 
 if __name__ == "__main__":
     migrate_dates()
@@ -1,8 +1,7 @@
 import os
-import time
 import sys
-from notion_client import Client
 from dotenv import load_dotenv
+from notion_manager import get_client, iter_database_pages
 
 # Force unbuffered output
 sys.stdout.reconfigure(line_buffering=True)
@@ -10,37 +9,27 @@ sys.stdout.reconfigure(line_buffering=True)
 print("Starting Reminder Backfill Script (KST Fix)...", flush=True)
 load_dotenv()
 API_KEY = os.getenv("NOTION_API_KEY")
+DB_ID = os.getenv("NOTION_DATABASE_ID")
 
 def migrate_reminders():
     print("Initializing Client...", flush=True)
     try:
-        client = Client(auth=API_KEY)
+        client = get_client(API_KEY)
     except Exception as e:
         print(f"Client init failed: {e}", flush=True)
         return
 
-    print("Searching for pages...", flush=True)
+    print("Querying pages with a registration start date...", flush=True)
     
-    has_more = True
-    next_cursor = None
     processed_count = 0
     updated_count = 0
     
-    while has_more:
-        try:
-            time.sleep(0.2)
-            resp = client.search(
-                filter={"property": "object", "value": "page"},
-                start_cursor=next_cursor,
-                page_size=50
-            )
-        except Exception as e:
-            print(f"\nSearch failed: {e}", flush=True)
-            break
-            
-        print(f"\nFetched {len(resp['results'])} items.", flush=True)
-        
-        for page in resp['results']:
+    try:
+        pages = iter_database_pages(
+            client, DB_ID,
+            filter={"property": "접수 시작일", "date": {"is_not_empty": True}}
+        )
+        for page in pages:
             props = page.get('properties', {})
             
             page_id = page['id']
@@ -86,14 +75,11 @@ def migrate_reminders():
                 print(f"Failed to update {page_title}: {e}", flush=True)
             
             processed_count += 1
-            
-        has_more = resp.get('has_more', False)
-        next_cursor = resp.get('next_cursor')
-        if processed_count > 200: 
-            print("\nReached 200 items limit. Stopping.", flush=True)
-            break
+    except Exception as e:
+        print(f"\nQuery failed: {e}", flush=True)
 
     print(f"\nReminder Backfill Complete. Processed {processed_count} relevant pages. Updated {updated_count} pages.", flush=True)
+    print(client.stats_summary(), flush=True)
 
 if __name__ == "__main__":
     migrate_reminders()
@@ -0,0 +1,231 @@
+"""
+Shared, memoized normalization of event names and dates.
+The same names and date strings are parsed many times per run (matching loops,
+Notion sync, migrations), so every parser here is wrapped in a bounded LRU cache.
+Cached functions must stay pure: anything depending on "today" takes it as an argument.
+"""
+
+import calendar
+import datetime
+import functools
+import re
+
+CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize_event_name(name):
+    """
+    Normalize event name for comparison by:
+    - Converting to lowercase
+    - Removing special characters
+    - Removing extra whitespace
+    - Removing common prefixes like year numbers
+    """
+    if not name:
+        return ""
+
+    # Convert to lowercase
+    normalized = name.lower()
+
+    # Remove year prefixes (2026, 제22회, etc.)
+    normalized = re.sub(r'^\d{4}\s*', '', normalized)
+    normalized = re.sub(r'^제\s*\d+회\s*', '', normalized)
+
+    # Remove special characters except Korean, English, numbers
+    normalized = re.sub(r'[^\w\s가-힣]', ' ', normalized)
+
+    # Remove extra whitespace
+    normalized = ' '.join(normalized.split())
+
+    return normalized
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_event_date(date_str):
+    """
+    Parses a YYYY-MM-DD event date. Returns a date, or None if missing/invalid.
+    """
+    if not date_str:
+        return None
+    try:
+        return datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_date(date_text):
+    """
+    Normalizes date string to YYYY-MM-DD.
+    Handles 'M/D(day)' or 'YYYY-MM-DD' or 'MM/DD'.
+    Assumes current year if year is missing, or infers from context if needed.
+    """
+    now = datetime.datetime.now()
+    return _normalize_date(date_text, now.year, now.month)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _normalize_date(date_text, current_year, current_month):
+    if not date_text:
+        return ""
+
+    # Simple YYYY-MM-DD check
+    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_text):
+        return date_text
+
+    # Handle "2/8(일)" or "02/08"
+    # Remove parens and day of week
+    text = re.sub(r'\(.*?\)', '', date_text).strip()
+
+    match = re.match(r'(\d{1,2})[-/.](\d{1,2})', text)
+    if match:
+        month, day = map(int, match.groups())
+        # Infer year: if month is earlier than current month by a lot, maybe next year?
+        # But usually schedules are for current/future.
+        # Let's assume current year for now, or check if it's in the past?
+        # Marathon schedule is usually for coming year.
+        # If we are in Dec and see Jan, it's next year.
+        # If we are in Jan and see Dec, it's this year (or last?).
+        year = current_year
+
+        # Heuristic: if month < now.month - 2, it's probably next year?
+        # (e.g. In Nov, see Jan race -> Next year)
+        if month < current_month - 3:
+             year += 1
+
+        return f"{year}-{month:02d}-{day:02d}"
+
+    return date_text
+
+
+def _parse_registration_date(d_str):
+    d_str = d_str.strip()
+    # Try formatting: YYYY.MM.DD
+    try:
+        return datetime.datetime.strptime(d_str, "%Y.%m.%d").date().isoformat()
+    except ValueError:
+        pass
+
+    # Try formatting: YYYY년MM월DD일
+    try:
+        # strptime with %Y년%m월%d일 works only if locale is set or using platform specific support.
+        # Safest: replace to dot format
+        d_clean = d_str.replace("년", ".").replace("월", ".").replace("일", "")
+        return datetime.datetime.strptime(d_clean, "%Y.%m.%d").date().isoformat()
+    except ValueError:
+        pass
+
+    # Try YYYY-MM-DD
+    try:
+        return datetime.datetime.strptime(d_str, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        pass
+
+    return None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_registration_dates(reg_str):
+    """
+    Parses a registration string like '2025.10.28 ~ 2025.11.10' or '2025년12월15일~2026년1월9일'
+    Returns (start_date_str, end_date_str) in YYYY-MM-DD format.
+    """
+    if not reg_str:
+        return None, None
+
+    try:
+        # Standardize separator
+        reg_str = reg_str.replace('～', '~')
+
+        if '~' in reg_str:
+            parts = reg_str.split('~')
+            start_date = _parse_registration_date(parts[0])
+            end_date = _parse_registration_date(parts[1])
+            return start_date, end_date
+        else:
+            return None, None
+
+    except Exception as e:
+        print(f"Error parsing dates from '{reg_str}': {e}")
+        return None, None
+
+
+def clamp_date(year, month, day):
+    """
+    Adjusts day to be valid for the given month/year.
+    e.g. 2026-04-31 -> 2026-04-30
+    """
+    try:
+        # Check standard validity first
+        datetime.date(year, month, day)
+        return year, month, day
+    except ValueError:
+        # Likely day is out of range
+        last_day = calendar.monthrange(year, month)[1]
+        clamped_day = min(day, last_day)
+        print(f"Warning: Clamped date {year}-{month}-{day} to {year}-{month}-{clamped_day}")
+        return year, month, clamped_day
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_date_robust(date_str):
+    """
+    Lenient single-date parser used by the Notion migrations.
+    Accepts YYYY.MM.DD and YYYY년MM월DD일 and clamps out-of-range days.
+    """
+    if not date_str:
+        return None
+
+    date_str = date_str.strip()
+
+    # Try YYYY.MM.DD
+    try:
+        dt = datetime.datetime.strptime(date_str, "%Y.%m.%d").date()
+        return dt.isoformat()
+    except ValueError:
+        pass
+
+    # Try YYYY년MM월DD일 (Korean format) with Regex to capture parts for clamping
+    clean_str = date_str.replace(" ", "")
+    try:
+        match = re.match(r"(\d{4})년(\d{1,2})월(\d{1,2})일", clean_str)
+        if match:
+            y, m, d =  map(int, match.groups())
+            y, m, d = clamp_date(y, m, d)
+            return f"{y}-{m:02d}-{d:02d}"
+    except Exception:
+        pass
+
+    # Regex for YYYY.MM.DD style but invalid days?
+    try:
+        match = re.search(r"(\d{4})\.(\d{1,2})\.(\d{1,2})", date_str)
+        if match:
+             y, m, d =  map(int, match.groups())
+             y, m, d = clamp_date(y, m, d)
+             return f"{y}-{m:02d}-{d:02d}"
+    except Exception:
+        pass
+
+    return None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_registration_period_robust(reg_str):
+    """
+    Lenient registration period parser used by the Notion migrations.
+    Returns (start_date_str, end_date_str) in YYYY-MM-DD format.
+    """
+    if not reg_str:
+        return None, None
+
+    if '~' not in reg_str:
+        return None, None
+
+    parts = reg_str.split('~')
+    start_str = parts[0].strip()
+    end_str = parts[1].strip()
+
+    start_date = parse_date_robust(start_str)
+    end_date = parse_date_robust(end_str)
+
+    return start_date, end_date
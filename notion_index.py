@@ -0,0 +1,269 @@
+"""
+Local index of the Notion events database: event key / title -> page id.
+Replaces the per-event client.search lookup (slow, fuzzy and eventually consistent,
+so freshly created pages were not found and got duplicated).
+The index is built once with a database query, refreshed each run with only the pages
+edited since the last sync, and updated in place whenever we create or update a page.
+"""
+
+import atexit
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+INDEX_FILE = os.path.join(os.path.dirname(__file__), 'data', 'notion_index.json')
+
+# Notion timestamps have minute precision; refresh from a bit before the last sync
+REFRESH_MARGIN = datetime.timedelta(minutes=2)
+
+
+def _plain_text(parts):
+    # Response objects carry plain_text; request payloads only text.content
+    return ''.join(p.get('plain_text', p.get('text', {}).get('content', '')) for p in parts or [])
+
+
+def _normalize_date_value(value):
+    if not value:
+        return None
+    try:
+        # '2026-03-15T09:00:00.000+09:00' (response) == '2026-03-15T09:00:00+09:00' (request)
+        return datetime.datetime.fromisoformat(value).isoformat() if 'T' in value else value
+    except ValueError:
+        return value
+
+
+def normalize_property(prop):
+    """
+    Reduces a property value, in request or response shape, to a comparable plain value:
+    title/rich_text -> text, select -> name, date -> (start, end), url/number/checkbox -> value.
+    Returns None for empty values; unsupported types are not compared (KeyError).
+    """
+    if prop is None:
+        return None
+    kind = prop.get('type') or next(iter(prop))
+    value = prop.get(kind)
+    if kind in ('title', 'rich_text'):
+        return _plain_text(value) or None
+    if kind == 'select':
+        return value.get('name') if value else None
+    if kind == 'date':
+        if not value:
+            return None
+        return [_normalize_date_value(value.get('start')), _normalize_date_value(value.get('end'))]
+    if kind in ('url', 'number', 'checkbox', 'email', 'phone_number'):
+        return value
+    raise KeyError(kind)
+
+
+def normalize_properties(properties):
+    """Comparable snapshot of a page's properties (unsupported types are left out)."""
+    snapshot = {}
+    for name, prop in properties.items():
+        try:
+            snapshot[name] = normalize_property(prop)
+        except (KeyError, AttributeError, StopIteration):
+            continue
+    return snapshot
+
+
+def normalize_title(title):
+    return ' '.join((title or '').split())
+
+
+def page_key(date_str, title):
+    # Same (Date + Name) key as data_manager.event_key
+    return f"{date_str}_{title}" if date_str and title else None
+
+
+def page_title(props):
+    for name in ('대회명', 'Name'):
+        prop = props.get(name)
+        if prop and prop.get('type') == 'title':
+            titles = prop.get('title', [])
+            return titles[0].get('plain_text', '') if titles else ''
+    return ''
+
+
+def _date_of(props):
+    prop = props.get('대회날짜') or {}
+    date = prop.get('date') or {}
+    return (date.get('start') or '')[:10] or None
+
+
+def is_ai_locked(props):
+    # Pages whose AI자동생성여부 select is set to anything but 'Y' are edited by hand
+    select_prop = (props.get('AI자동생성여부') or {}).get('select')
+    return bool(select_prop and select_prop.get('name') != 'Y')
+
+
+class NotionIndex:
+    def __init__(self, db_id, path=INDEX_FILE):
+        self.db_id = db_id.replace('-', '')
+        self.path = path
+        self.synced_at = None
+        self.pages = {}  # page_id -> {'key', 'title', 'props', 'ai_locked'}
+        self._by_key = {}
+        self._by_title = {}  # normalized title -> [page_id, ...] in the order seen
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        if data.get('database_id') != self.db_id:
+            return
+        self.synced_at = data.get('synced_at')
+        for page_id, entry in data.get('pages', {}).items():
+            self._put(page_id, entry)
+
+    def flush(self):
+        """Saves the index if records were added since the last save."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def save(self):
+        with self._lock:
+            self._dirty = False
+            data = {'database_id': self.db_id, 'synced_at': self.synced_at, 'pages': self.pages}
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.notion_index-', suffix='.json')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def _unlink(self, page_id):
+        old = self.pages.pop(page_id, None)
+        if not old:
+            return
+        if self._by_key.get(old.get('key')) == page_id:
+            del self._by_key[old['key']]
+        title = normalize_title(old.get('title'))
+        same_title = self._by_title.get(title)
+        if same_title and page_id in same_title:
+            same_title.remove(page_id)
+            if not same_title:
+                del self._by_title[title]
+
+    def _put(self, page_id, entry):
+        self._unlink(page_id)
+        self.pages[page_id] = entry
+        if entry.get('key'):
+            self._by_key[entry['key']] = page_id
+        title = normalize_title(entry.get('title'))
+        if title:
+            self._by_title.setdefault(title, []).append(page_id)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def lookup(self, key=None, title=None):
+        """
+        Returns (page_id, entry) by event key, or (None, None).
+        Falls back to the exact (whitespace normalized) title, but only for a page without
+        a date or with the event's date: same-titled races on other dates are other pages.
+        """
+        with self._lock:
+            page_id = self._by_key.get(key) if key else None
+            if page_id is None and title:
+                date_str = key.split('_', 1)[0] if key else None
+                for candidate in self._by_title.get(normalize_title(title), []):
+                    candidate_key = self.pages[candidate].get('key')
+                    if not candidate_key or not date_str or candidate_key.split('_', 1)[0] == date_str:
+                        page_id = candidate
+                        break
+            if page_id is None:
+                return None, None
+            return page_id, self.pages[page_id]
+
+    def record_page(self, page):
+        """Indexes a page object returned by the Notion API."""
+        props = page.get('properties', {})
+        title = page_title(props)
+        with self._lock:
+            if page.get('archived') or page.get('in_trash'):
+                self.forget(page['id'])
+                return
+            snapshot = normalize_properties(props)
+            self._put(page['id'], {
+                'key': page_key(_date_of(props), title),
+                'title': title,
+                'props': snapshot,
+                'ai_locked': is_ai_locked(props),
+            })
+
+    def record(self, page_id, title, date_str=None, props=None, ai_locked=False):
+        """
+        Records a page we just created or updated. The index is only marked dirty;
+        call flush() once the batch is done.
+        props is the normalized snapshot of the page's properties after the write.
+        """
+        with self._lock:
+            props = props or {}
+            self._put(page_id, {
+                'key': page_key(date_str, title),
+                'title': title,
+                'props': props,
+                'ai_locked': ai_locked,
+            })
+            self._dirty = True
+
+    def forget(self, page_id):
+        with self._lock:
+            self._unlink(page_id)
+
+    def refresh(self, client, query_pages):
+        """
+        Brings the index up to date: a full database scan the first time, afterwards only
+        pages edited since the last sync (so manual edits such as AI locks are picked up).
+        query_pages(client, db_id, filter=None) must yield page objects.
+        """
+        with self._lock:
+            started = datetime.datetime.now(datetime.timezone.utc)
+            page_filter = None
+            if self.synced_at:
+                since = datetime.datetime.fromisoformat(self.synced_at) - REFRESH_MARGIN
+                page_filter = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": since.isoformat()},
+                }
+            count = 0
+            for page in query_pages(client, self.db_id, filter=page_filter):
+                self.record_page(page)
+                count += 1
+            self.synced_at = started.isoformat()
+            self.save()
+            print(f"Notion index: {'refreshed' if page_filter else 'built'} from {count} pages ({len(self.pages)} indexed)")
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(client, db_id, query_pages):
+    """
+    Process-wide index per database, loaded from disk and refreshed on first use.
+    Unsaved records are flushed at interpreter exit as a safety net.
+    """
+    key = db_id.replace('-', '')
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = NotionIndex(db_id)
+            index.refresh(client, query_pages)
+            atexit.register(index.flush)
+            _indexes[key] = index
+        return index
@@ -1,65 +1,65 @@
 import os
 import datetime
-from notion_client import Client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from notion_client.errors import APIResponseError
+from normalization import parse_registration_dates
+from notion_throttle import ThrottledClient
+from notion_index import get_index, is_ai_locked, normalize_properties, normalize_property, normalize_title, page_title
 
 def get_client(token):
-    return Client(auth=token)
+    """
+    Notion client that throttles to ~3 req/s and retries 429/5xx (see notion_throttle).
+    """
+    return ThrottledClient(auth=token)
 
-def parse_registration_dates(reg_str):
+_data_source_ids = {}
+
+def query_database(client, db_id, **body):
     """
-    Parses a registration string like '2025.10.28 ~ 2025.11.10' or '2025년12월15일~2026년1월9일'
-    Returns (start_date_str, end_date_str) in YYYY-MM-DD format.
+    One page of a database query. notion-client 3.x queries the database's data source
+    (resolved once per database); older clients still have databases.query.
     """
-    if not reg_str:
-        return None, None
-        
-    try:
-        # Standardize separator
-        reg_str = reg_str.replace('~', '~')
-        
-        if '~' in reg_str:
-            parts = reg_str.split('~')
-            start_str = parts[0].strip()
-            end_str = parts[1].strip()
-            
-            def parse_date(d_str):
-                d_str = d_str.strip()
-                # Try formatting: YYYY.MM.DD
-                try:
-                    return datetime.datetime.strptime(d_str, "%Y.%m.%d").date().isoformat()
-                except ValueError:
-                    pass
-                
-                # Try formatting: YYYY년MM월DD일
-                try:
-                    # Remove trailing chars if needed, but strict matching is better
-                    # d_str might be "2025년12월15일"
-                    # Replace Korean chars with dots/dashes? Or use format string
-                    # strptime with %Y년%m월%d일 works only if locale is set or using platform specific support.
-                    # Safest: replace to dot format
-                    d_clean = d_str.replace("년", ".").replace("월", ".").replace("일", "")
-                    return datetime.datetime.strptime(d_clean, "%Y.%m.%d").date().isoformat()
-                except ValueError:
-                    pass
-                
-                # Try YYYY-MM-DD
-                try:
-                    return datetime.datetime.strptime(d_str, "%Y-%m-%d").date().isoformat()
-                except ValueError:
-                    pass
-                    
-                return None
-
-            start_date = parse_date(start_str)
-            end_date = parse_date(end_str)
-                
-            return start_date, end_date
-        else:
-            return None, None
-            
-    except Exception as e:
-        print(f"Error parsing dates from '{reg_str}': {e}")
-        return None, None
+    if not hasattr(client, 'data_sources'):
+        return client.databases.query(database_id=db_id, **body)
+    if db_id not in _data_source_ids:
+        database = client.databases.retrieve(database_id=db_id)
+        _data_source_ids[db_id] = database['data_sources'][0]['id']
+    return client.data_sources.query(data_source_id=_data_source_ids[db_id], **body)
+
+def iter_database_pages(client, db_id, filter=None, sorts=None, page_size=100):
+    """
+    Streams every page of the database matching `filter` (Notion filter object),
+    fetching page_size (max 100) results per request and yielding them lazily.
+    """
+    body = {'page_size': page_size}
+    if filter:
+        body['filter'] = filter
+    if sorts:
+        body['sorts'] = sorts
+    while True:
+        response = query_database(client, db_id, **body)
+        yield from response.get('results', [])
+        if not response.get('has_more'):
+            return
+        body['start_cursor'] = response.get('next_cursor')
+
+def changed_properties(properties, snapshot):
+    """
+    The subset of `properties` (request payload) whose values differ from `snapshot`
+    (normalize_properties of the current page). With no snapshot, everything is sent.
+    """
+    if snapshot is None:
+        return dict(properties)
+    changed = {}
+    for name, prop in properties.items():
+        try:
+            if normalize_property(prop) == snapshot.get(name):
+                continue
+        except KeyError:
+            pass
+        changed[name] = prop
+    return changed
 
 def determine_status(start_date, end_date):
     """
@@ -83,18 +83,10 @@ def determine_status(start_date, end_date):
     except:
         return None
 
-def sync_event_to_notion(client, db_id, event):
+def _search_existing_page(client, db_id, event_name):
     """
-    Syncs a single event to Notion.
+    Finds the event's page with a title search. Returns (page_id, properties) or (None, {}).
     """
-    event_name = event.get('name')
-    if not event_name:
-        return {'status': 'skipped', 'name': 'Unknown', 'message': 'No event name'}
-
-    # 1. Check if event exists (USING SEARCH FILTER)
-    existing_page_id = None
-    existing_props = {}
-    
     try:
         # Search for page by title (Fuzzy match)
         search_response = client.search(
@@ -103,40 +95,111 @@ def sync_event_to_notion(client, db_id, event):
         )
         
         # Manually filter for Exact Match + Correct Database ID
-        if search_response.get('results'):
-            for page in search_response['results']:
-                # Check Database Parent
-                parent = page.get('parent', {})
-                if parent.get('type') == 'database_id' and parent.get('database_id').replace('-', '') == db_id.replace('-', ''):
-                    # Check Title Exact Match
-                    props = page.get('properties', {})
-                    title_content = ""
-                    
-                    if '대회명' in props and props['대회명']['type'] == 'title':
-                         titles = props['대회명'].get('title', [])
-                         if titles:
-                             title_content = titles[0].get('plain_text', '')
-                    elif 'Name' in props and props['Name']['type'] == 'title':
-                         titles = props['Name'].get('title', [])
-                         if titles:
-                             title_content = titles[0].get('plain_text', '')
-                    
-                    if title_content == event_name:
-                        existing_page_id = page['id']
-                        existing_props = props
-                        break
-            
-            if existing_page_id:
-                # Check AI Lock
-                if 'AI자동생성여부' in existing_props:
-                    select_prop = existing_props['AI자동생성여부'].get('select')
-                    if select_prop and select_prop.get('name') != 'Y':
-                        print(f"Skipping {event_name}: AI Update Locked.")
-                        return {'status': 'skipped', 'name': event_name, 'message': 'AI Update Locked'}
-
+        for page in search_response.get('results', []):
+            # Check Database Parent
+            parent = page.get('parent', {})
+            if parent.get('type') == 'database_id' and parent.get('database_id').replace('-', '') == db_id.replace('-', ''):
+                # Check Title Exact Match
+                props = page.get('properties', {})
+                if page_title(props) == event_name:
+                    return page['id'], props
     except Exception as e:
         print(f"Error in search/sync for {event_name}: {e}")
-        pass
+
+    return None, {}
+
+_title_locks = {}
+_title_locks_guard = threading.Lock()
+
+def _title_lock(event_name):
+    # Lookup + create/update for one title must not interleave, or two workers could both create the page
+    key = normalize_title(event_name)
+    with _title_locks_guard:
+        return _title_locks.setdefault(key, threading.Lock())
+
+def sync_event_to_notion(client, db_id, event, index=None, search_fallback=False):
+    """
+    Syncs a single event to Notion.
+    Existing pages are found through the local page index (notion_index), which is
+    kept up to date with every page created or updated here. With search_fallback,
+    the index is not used (e.g. it already failed to build) and pages are found by search.
+    Safe to call from several threads: events with the same title are synced one at a time.
+    """
+    event_name = event.get('name')
+    if not event_name:
+        return {'status': 'skipped', 'name': 'Unknown', 'message': 'No event name'}
+
+    with _title_lock(event_name):
+        return _sync_event(client, db_id, event, index, search_fallback)
+
+def open_index(client, db_id):
+    """
+    Builds (or reuses) the page index for a sync run. Returns (index, search_fallback):
+    if the build fails, index is None and search_fallback tells the workers to search
+    instead of retrying the build for every event.
+    """
+    try:
+        return get_index(client, db_id, iter_database_pages), False
+    except Exception as e:
+        print(f"Notion index unavailable, falling back to search: {e}")
+        return None, True
+
+def sync_event_result(client, db_id, event, index=None, search_fallback=False):
+    """
+    sync_event_to_notion for worker pools: always returns a result dict, errors included.
+    """
+    try:
+        result = sync_event_to_notion(client, db_id, event, index, search_fallback)
+    except Exception as e:
+        result = {'status': 'error', 'name': event.get('name', 'Unknown'), 'message': str(e)}
+    # Fallback if function returns None (unexpected)
+    return result or {'status': 'unknown', 'name': event.get('name', 'Unknown'), 'message': 'No result returned'}
+
+def sync_events_to_notion(client, db_id, events, max_workers=3, index=None):
+    """
+    Syncs many events with a small thread pool. All workers share the client, and with it
+    its rate limiter, and the page index. Returns one result dict per event, in input order.
+    """
+    search_fallback = False
+    if index is None:
+        index, search_fallback = open_index(client, db_id)
+
+    def sync_one(event):
+        return sync_event_result(client, db_id, event, index, search_fallback)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(sync_one, events))
+
+    # Records only mark the index dirty; write it once for the whole batch
+    if index is not None:
+        index.flush()
+    return results
+
+def _sync_event(client, db_id, event, index, search_fallback):
+    event_name = event['name']
+
+    # 1. Check if event exists (local page index, search as a fallback)
+    existing_page_id = None
+    
+    if index is None and not search_fallback:
+        try:
+            index = get_index(client, db_id, iter_database_pages)
+        except Exception as e:
+            print(f"Notion index unavailable, falling back to search: {e}")
+
+    event_date_str = event.get('date')
+    if index is not None:
+        existing_page_id, entry = index.lookup(f"{event_date_str}_{event_name}" if event_date_str else None, event_name)
+        locked = bool(entry and entry.get('ai_locked'))
+        existing_snapshot = entry.get('props') if entry else None
+    else:
+        existing_page_id, existing_props = _search_existing_page(client, db_id, event_name)
+        locked = is_ai_locked(existing_props)
+        existing_snapshot = normalize_properties(existing_props) if existing_page_id else None
+
+    if existing_page_id and locked:
+        print(f"Skipping {event_name}: AI Update Locked.")
+        return {'status': 'skipped', 'name': event_name, 'message': 'AI Update Locked'}
 
     # 2. Prepare Properties
     start_date, end_date = parse_registration_dates(event.get('registration_period', ''))
@@ -173,7 +236,6 @@ def sync_event_to_notion(client, db_id, event):
         properties["교차검증여부"] = {"select": {"name": "Y"}}
     
     # Handle optional date
-    event_date_str = event.get('date')
     if event_date_str:
         properties["대회날짜"] = {"date": {"start": event_date_str}} if event_date_str else None
 
@@ -197,11 +259,32 @@ def sync_event_to_notion(client, db_id, event):
              msg += f" ({changes})"
 
         if existing_page_id:
-            client.pages.update(page_id=existing_page_id, properties=properties)
-            print(f"Updated Notion: {event_name}")
+            # Send only what differs from the page as we last saw it
+            updates = changed_properties(properties, existing_snapshot)
+            if not updates:
+                print(f"Unchanged Notion: {event_name}")
+                return {'status': 'unchanged', 'name': event_name, 'message': 'Already up to date'}
+            try:
+                client.pages.update(page_id=existing_page_id, properties=updates)
+            except APIResponseError as e:
+                # Page deleted or archived since it was indexed: create a fresh one
+                if index is None or not (e.code == 'object_not_found' or 'archived' in str(e)):
+                    raise
+                print(f"Indexed page for {event_name} is gone; recreating.")
+                index.forget(existing_page_id)
+                existing_page_id = None
+
+        if existing_page_id:
+            if index is not None:
+                snapshot = dict(existing_snapshot or {})
+                snapshot.update(normalize_properties(updates))
+                index.record(existing_page_id, event_name, event_date_str, snapshot)
+            print(f"Updated Notion: {event_name} ({', '.join(updates)})")
             return {'status': 'updated', 'name': event_name, 'message': msg, 'details': changes}
         else:
-            client.pages.create(parent={"database_id": db_id}, properties=properties)
+            page = client.pages.create(parent={"database_id": db_id}, properties=properties)
+            if index is not None:
+                index.record(page['id'], event_name, event_date_str, normalize_properties(properties))
             print(f"Created Notion: {event_name} (New)")
             return {'status': 'created', 'name': event_name, 'message': 'Created new page'}
             
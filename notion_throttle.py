@@ -0,0 +1,100 @@
+"""
+Notion client that paces itself to the API's rate limit.
+Every request (pages, databases, data_sources, search, ...) goes through Client.request,
+so throttling and retries live there: a shared token bucket keeps the average at
+~3 requests/sec, 429 responses wait for Retry-After, and 5xx/timeouts are retried
+with jittered exponential backoff.
+"""
+
+import random
+import threading
+import time
+
+from notion_client import Client
+from notion_client.client import ClientOptions
+from notion_client.errors import APIResponseError, RequestTimeoutError
+
+from rate_limiter import TokenBucket
+
+# Notion allows an average of three requests per second per integration
+DEFAULT_RATE = 3.0
+DEFAULT_BURST = 3
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+
+def _retry_after_seconds(error):
+    headers = getattr(error, 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ThrottledClient(Client):
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, bucket=None, sleep=None, **kwargs):
+        # Newer notion-client versions retry on their own; we do it here instead
+        if 'retry' in getattr(ClientOptions, '__dataclass_fields__', {}):
+            kwargs.setdefault('retry', False)
+        super().__init__(**kwargs)
+        self._sleep = sleep or time.sleep
+        self.bucket = bucket or TokenBucket(rate, burst, sleep=self._sleep)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'throttle_wait': 0.0, 'retry_wait': 0.0}
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _is_retryable(self, error, method, path):
+        if isinstance(error, APIResponseError):
+            if error.status == 429:
+                return True
+            if error.status not in RETRYABLE_STATUS:
+                return False
+        elif not isinstance(error, RequestTimeoutError):
+            return False
+        # A create that timed out or hit a gateway error may have gone through;
+        # only retry it when the server says it was not processed
+        if method.lower() == 'post' and path.rstrip('/') == 'pages':
+            return getattr(error, 'status', None) in (429, 503)
+        return True
+
+    def request(self, path, method, query=None, body=None, form_data=None, auth=None):
+        attempt = 0
+        while True:
+            self._count('throttle_wait', self.bucket.acquire())
+            self._count('calls')
+            try:
+                return super().request(path, method, query=query, body=body, form_data=form_data, auth=auth)
+            except (APIResponseError, RequestTimeoutError) as error:
+                if attempt >= self.max_retries or not self._is_retryable(error, method, path):
+                    raise
+                delay = None
+                if getattr(error, 'status', None) == 429:
+                    self._count('rate_limited')
+                    delay = _retry_after_seconds(error)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                print(f"Notion {method.upper()} {path} failed ({getattr(error, 'status', 'timeout')}); "
+                      f"retrying in {delay:.1f}s")
+                self._count('retries')
+                self._count('retry_wait', delay)
+                self._sleep(delay)
+                attempt += 1
+
+    def stats_summary(self):
+        with self._stats_lock:
+            s = dict(self.stats)
+        return (f"Notion API: {s['calls']} calls, {s['retries']} retries "
+                f"({s['rate_limited']} rate limited), throttled {s['throttle_wait']:.1f}s, "
+                f"backed off {s['retry_wait']:.1f}s")
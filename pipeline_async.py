@@ -0,0 +1,161 @@
+"""
+Async end-to-end pipeline: `python main.py --async`.
+Same steps as main.main, but after change detection the target events stream through
+bounded queues: detail enrichment workers feed Notion sync workers, so the first
+events are written to Notion while later detail pages are still downloading.
+Blocking scrapers and the Notion client run in worker threads via asyncio.to_thread.
+"""
+
+import asyncio
+import datetime
+import os
+
+from dotenv import load_dotenv
+
+from pipeline_steps import (
+    log_execution_report,
+    merge_details,
+    open_store,
+    save_enriched_events,
+    select_target_events,
+    validate_events,
+    write_script,
+)
+from notion_manager import get_client, open_index, sync_event_result
+from rate_limiter import HostRateLimiter
+from scraper import fetch_event_details
+from sources import fetch_all_sources
+
+load_dotenv()
+
+_DONE = object()
+
+
+async def enrich_worker(detail_queue, sync_queue, limiter):
+    while True:
+        item = await detail_queue.get()
+        if item is _DONE:
+            return
+        index, event = item
+        link = event.get('link')
+        # A failing event must not end the worker: the queues would fill up and block
+        try:
+            if link:
+                # Pages of updated events changed upstream, so they skip the cache TTL.
+                # The limiter only paces requests that miss the cache.
+                revalidate = event.get('data_status') == 'updated'
+                details = await asyncio.to_thread(fetch_event_details, link, revalidate, limiter)
+                merge_details(event, details)
+        except Exception as e:
+            print(f"Error fetching details for {event.get('name')}: {e}")
+        status_label = event.get('data_status', 'new').upper()
+        print(f"  - [{status_label}] Enriched: {event.get('name')}")
+        if sync_queue is not None:
+            await sync_queue.put((index, event))
+
+
+async def sync_worker(sync_queue, client, db_id, results, page_index, search_fallback):
+    while True:
+        item = await sync_queue.get()
+        if item is _DONE:
+            return
+        index, event = item
+        results[index] = await asyncio.to_thread(sync_event_result, client, db_id, event,
+                                                 page_index, search_fallback)
+
+
+async def stream_events(target_events, client=None, db_id=None, detail_workers=4, sync_workers=3,
+                        queue_size=8, rate=1.0, burst=1, page_index=None, search_fallback=False):
+    """
+    Runs target events through enrichment and (if a client is given) Notion sync.
+    Queues are bounded so a slow Notion stage applies backpressure to the downloads.
+    The Notion page index is built once up front unless page_index or search_fallback is given.
+    Events are enriched in place; returns the sync results in input order.
+    """
+    if client is not None and page_index is None and not search_fallback:
+        page_index, search_fallback = await asyncio.to_thread(open_index, client, db_id)
+
+    detail_queue = asyncio.Queue(maxsize=queue_size)
+    sync_queue = asyncio.Queue(maxsize=queue_size) if client is not None else None
+    limiter = HostRateLimiter(rate=rate, capacity=burst)
+    results = [None] * len(target_events)
+
+    enrichers = [asyncio.create_task(enrich_worker(detail_queue, sync_queue, limiter))
+                 for _ in range(max(1, detail_workers))]
+    syncers = []
+    if sync_queue is not None:
+        syncers = [asyncio.create_task(sync_worker(sync_queue, client, db_id, results, page_index, search_fallback))
+                   for _ in range(max(1, sync_workers))]
+
+    for item in enumerate(target_events):
+        await detail_queue.put(item)
+    for _ in enrichers:
+        await detail_queue.put(_DONE)
+    await asyncio.gather(*enrichers)
+
+    for _ in syncers:
+        await sync_queue.put(_DONE)
+    await asyncio.gather(*syncers)
+
+    return [result for result in results if result is not None]
+
+
+async def run_pipeline_async():
+    print(f"[{datetime.datetime.now()}] Starting Marathon News Bot (async pipeline)...")
+
+    # 1. Scrape from Multiple Sources
+    events_by_source = await asyncio.to_thread(fetch_all_sources)
+
+    if not any(events_by_source.values()):
+        print("No events found from any source.")
+        log_execution_report([], new_events_found=False, no_source_events=True)
+        return
+
+    # Cross-validation and change detection need the full lists, so they run before streaming
+    latest_events = validate_events(events_by_source)
+
+    # 2. Detect Changes
+    store = open_store(latest_events)
+    new_events, updated_events = select_target_events(latest_events, store)
+
+    if not new_events and not updated_events:
+        print("No new events relative to stored data.")
+        save_enriched_events([], store)
+        log_execution_report([], new_events_found=False)
+        return
+
+    print(f"Found {len(new_events)} new events and {len(updated_events)} updated events.")
+    target_events = new_events + updated_events
+
+    # 3 + 4. Enrich and sync to Notion as a stream
+    notion_key = os.getenv("NOTION_API_KEY")
+    notion_db = os.getenv("NOTION_DATABASE_ID")
+
+    if notion_key and notion_db:
+        print("Fetching details and syncing events to Notion...")
+        n_client = get_client(notion_key)
+        # One index build for the run; if it fails, every worker searches instead
+        page_index, search_fallback = await asyncio.to_thread(open_index, n_client, notion_db)
+        sync_results = await stream_events(target_events, n_client, notion_db,
+                                           page_index=page_index, search_fallback=search_fallback)
+        # Records only mark the index dirty; write it once for the run
+        if page_index is not None:
+            page_index.flush()
+        print(n_client.stats_summary())
+    else:
+        print("Notion credentials not found. Fetching details only.")
+        await stream_events(target_events)
+        sync_results = [{'status': 'skipped', 'name': 'ALL', 'message': 'Notion credentials missing'}]
+
+    # Script generation needs every enriched event
+    write_script(target_events)
+
+    # 5. Save Enriched Data
+    save_enriched_events(target_events, store)
+
+    # 6. Logging
+    log_execution_report(sync_results, True)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_pipeline_async())
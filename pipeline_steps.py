@@ -0,0 +1,133 @@
+"""
+Pipeline steps shared by the sequential run (main.py) and the async pipeline
+(pipeline_async.py): validation, change detection, enrichment merge, script
+output, saving and the execution log.
+"""
+
+import datetime
+import os
+from cross_validator import reconcile_events, get_validation_summary
+from data_manager import EventStore, detect_changes, event_key
+from script_generator import generate_script
+
+def validate_events(events_by_source):
+    """
+    Cross-validates the scraped sources into one event list and prints the summary.
+    """
+    print(" | ".join(f"{name}: {len(events)} events" for name, events in events_by_source.items()))
+    
+    # Cross-validate the data
+    print("Cross-validating event data...")
+    latest_events = reconcile_events(events_by_source)
+    validation_summary = get_validation_summary(latest_events)
+    
+    print(f"Cross-validation complete:")
+    print(f"  Total: {validation_summary['total_events']} events")
+    print(f"  Cross-validated: {validation_summary['cross_validated']} ({validation_summary['validation_rate']}%)")
+    print(f"  High confidence: {validation_summary['high_confidence']}")
+    return latest_events
+
+def open_store(latest_events):
+    # One store per run: loaded once here, flushed once at the end
+    return EventStore([event_key(event) for event in latest_events])
+
+def select_target_events(latest_events, store):
+    """
+    Detects changes against the run's store. Returns (new_events, updated_events).
+    """
+    new_events = []
+    updated_events = []
+    
+    if store.is_empty:
+        print("First run detected. Initializing database with current events...")
+        new_events, _ = detect_changes(latest_events, store) # Ignore updates on first run
+        
+        if len(new_events) > 10:
+             print(f"First run: {len(new_events)} events found. Marking as read to avoid spam.")
+             new_events = [] 
+    else:
+        new_events, updated_events = detect_changes(latest_events, store)
+    return new_events, updated_events
+
+def merge_details(event, details):
+    # Merge details into event
+    # Only overwrite if detail is not empty
+    for k, v in details.items():
+        if v:
+            event[k] = v
+    return event
+
+def write_script(enriched_events):
+    print("Generating script...")
+    
+    # Pass enriched events to script generator
+    # We might want to indicate which are NEW and which are UPDATED in the script?
+    # script_generator.py might need update if we want that distinction visible.
+    # For now, just pass them all.
+    
+    script = generate_script(enriched_events)
+
+    output_dir = "output"
+    os.makedirs(output_dir, exist_ok=True)
+    today_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    output_file = os.path.join(output_dir, f"script_{today_str}.txt")
+    
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(script)
+    
+    print(f"Script generated: {output_file}")
+    print("="*30)
+    print(script)
+    print("="*30)
+
+def save_enriched_events(enriched_events, store):
+    # We must update stored_events with the enriched details so we can detect changes later.
+    for event in enriched_events:
+        store.put(event)
+    count = store.flush()
+    if count:
+        print(f"Saved {count} events to local database.")
+
+def log_execution_report(sync_results, new_events_found=True, no_source_events=False):
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    today_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    log_file = os.path.join(log_dir, f"daily_log_{today_str}.txt")
+    
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write(f"\n[{timestamp}] Execution Report\n")
+        f.write(f"{'='*30}\n")
+        
+        # Summary Stats
+        total_synced = len([r for r in sync_results if r['status'] in ['created', 'updated']])
+        total_unchanged = len([r for r in sync_results if r['status'] == 'unchanged'])
+        total_errors = len([r for r in sync_results if r['status'] == 'error'])
+        total_skipped = len([r for r in sync_results if r['status'] == 'skipped'])
+        
+        summary = f"Synced: {total_synced}, Unchanged: {total_unchanged}, Errors: {total_errors}, Skipped: {total_skipped}"
+        f.write(f"Summary: {summary}\n")
+        
+        if no_source_events:
+             f.write("Status: No events found from any source (Scraping failed or empty).\n")
+        elif not new_events_found:
+             f.write("Status: No new events found to sync.\n")
+        
+        f.write(f"{'-'*30}\n")
+        
+        # Detailed Logs
+        for res in sync_results:
+            f.write(f"[{res['status'].upper()}] {res['name']}: {res['message']}\n")
+            if res.get('details'):
+                 f.write(f"    -> Changes: {res['details']}\n")
+            
+        f.write(f"{'='*30}\n")
+
+    print(f"\nLog saved to: {log_file}")
+    if no_source_events:
+        print("Result: No source events found.")
+    elif not new_events_found:
+        print("Result: No new events to sync.")
+    else:
+        print(f"Sync Result: {summary}")
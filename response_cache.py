@@ -0,0 +1,135 @@
+"""
+On-disk HTTP response cache.
+Bodies are stored content-addressed by URL hash together with their fetch time and
+validators (ETag / Last-Modified). Entries expire per source TTL and the cache is
+kept under a size cap by evicting the least recently used bodies.
+Cache hits only update access times in memory; the index is written on put/touch
+and by flush().
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'http_cache')
+
+# Seconds a cached body is served without touching the network, per source
+DEFAULT_TTLS = {
+    'roadrun_list': 10 * 60,
+    'roadrun_detail': 12 * 60 * 60,
+}
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttls=None, max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty = False
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def flush(self):
+        """Writes access times recorded by get() since the last save."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key + '.html')
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """
+        Returns (entry, body) for url, or (None, None) if it is not cached.
+        entry holds 'fetched_at', 'etag' and 'last_modified'.
+        """
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._load().get(key)
+            if not entry:
+                return None, None
+            try:
+                with open(self._body_path(key), 'r', encoding='utf-8', newline='') as f:
+                    body = f.read()
+            except OSError:
+                del self._index[key]
+                self._dirty = True
+                return None, None
+            entry['last_access'] = self.clock()
+            self._dirty = True
+            return dict(entry), body
+
+    def is_fresh(self, entry, source):
+        ttl = self.ttls.get(source, 0)
+        return bool(entry) and ttl > 0 and self.clock() - entry['fetched_at'] < ttl
+
+    def put(self, url, body, etag=None, last_modified=None):
+        key = self.key_for(url)
+        data = body.encode('utf-8')
+        now = self.clock()
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._body_path(key), 'wb') as f:
+                f.write(data)
+            self._load()[key] = {
+                'url': url,
+                'fetched_at': now,
+                'last_access': now,
+                'size': len(data),
+                'etag': etag,
+                'last_modified': last_modified,
+            }
+            self._evict()
+            self._save()
+
+    def touch(self, url):
+        """Marks a revalidated (304) entry as freshly fetched."""
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry:
+                entry['fetched_at'] = entry['last_access'] = self.clock()
+                self._save()
+
+    def _evict(self):
+        # Caller holds the lock
+        total = sum(e['size'] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._index[key]
+
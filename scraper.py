@@ -1,209 +1,257 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import datetime
+import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import HostRateLimiter
+from http_session import fetch_text
+from normalization import normalize_date
 
-def normalize_date(date_text):
+try:
+    import lxml.html
+    PARSER_BACKEND = 'lxml'
+except ImportError:
+    PARSER_BACKEND = 'html.parser'
+
+# Text inside these tags is not part of the visible cell text (matches BeautifulSoup.get_text)
+_SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+
+def _lxml_text(node, parts):
+    # Mirrors get_text(strip=True): stripped text nodes joined without separator
+    if isinstance(node.tag, str) and node.tag not in _SKIP_TEXT_TAGS:
+        if node.text:
+            parts.append(node.text.strip())
+        for child in node:
+            _lxml_text(child, parts)
+            if child.tail:
+                parts.append(child.tail.strip())
+    return parts
+
+def _schedule_rows_lxml(html):
+    root = lxml.html.document_fromstring(html)
+    for row in root.iter('tr'):
+        cols = [c for c in row if c.tag == 'td']
+        if len(cols) != 4:
+            continue
+        name_element = next(cols[1].iter('a'), None)
+        raw_href = name_element.get('href') if name_element is not None else None
+        yield tuple(''.join(_lxml_text(c, [])) for c in cols) + (raw_href,)
+
+def _schedule_rows_soup(html, parser):
+    # Only <tr> subtrees are built; everything else on the page is skipped by the strainer
+    soup = BeautifulSoup(html, parser, parse_only=SoupStrainer('tr'))
+    for row in soup.find_all('tr'):
+        cols = row.find_all('td', recursive=False)
+        if len(cols) != 4:
+            continue
+        name_element = cols[1].find('a')
+        raw_href = name_element.get('href') if name_element else None
+        yield tuple(c.get_text(strip=True) for c in cols) + (raw_href,)
+
+def iter_schedule_rows(html, backend=None):
     """
-    Normalizes date string to YYYY-MM-DD.
-    Handles 'M/D(day)' or 'YYYY-MM-DD' or 'MM/DD'.
-    Assumes current year if year is missing, or infers from context if needed.
+    Yields (date, name, location, organizer, href) cell tuples for every 4-column
+    table row of the roadrun list page. Uses lxml directly when available,
+    otherwise BeautifulSoup restricted to <tr> elements.
     """
-    if not date_text:
-        return ""
-    
-    # Simple YYYY-MM-DD check
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_text):
-        return date_text
-        
-    current_year = datetime.datetime.now().year
-    
-    # Handle "2/8(일)" or "02/08"
-    # Remove parens and day of week
-    text = re.sub(r'\(.*?\)', '', date_text).strip()
-    
-    match = re.match(r'(\d{1,2})[-/.](\d{1,2})', text)
-    if match:
-        month, day = map(int, match.groups())
-        # Infer year: if month is earlier than current month by a lot, maybe next year? 
-        # But usually schedules are for current/future.
-        # Let's assume current year for now, or check if it's in the past?
-        # Marathon schedule is usually for coming year.
-        # If we are in Dec and see Jan, it's next year.
-        # If we are in Jan and see Dec, it's this year (or last?).
-        now = datetime.datetime.now()
-        year = now.year
-        
-        # Heuristic: if month < now.month - 2, it's probably next year? 
-        # (e.g. In Nov, see Jan race -> Next year)
-        if month < now.month - 3: 
-             year += 1
-        
-        return f"{year}-{month:02d}-{day:02d}"
-        
-    return date_text
-
-def fetch_marathon_schedule():
+    backend = backend or PARSER_BACKEND
+    if backend == 'lxml':
+        return _schedule_rows_lxml(html)
+    return _schedule_rows_soup(html, backend)
+
+# Fields of a list row that depend only on its raw cells
+SCHEDULE_ROW_FIELDS = ('date', 'date_raw', 'name', 'location', 'organizer', 'link')
+
+def row_fingerprint(cells):
+    """
+    Stable digest of a raw list row (date, name, location, organizer, href).
+    Unchanged rows keep the same fingerprint across runs.
+    """
+    joined = '\x1f'.join(c or '' for c in cells)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+def _is_event_row(cells):
+    date_raw, name_text = cells[0], cells[1]
+    return bool(date_raw) and "날짜" not in date_raw and bool(name_text)
+
+def _build_schedule_event(cells):
+    date_raw, name_text, location_text, organizer_text, raw_href = cells
+
+    # Normalize Date
+    date_text = normalize_date(date_raw)
+
+    link = ""
+    if raw_href is not None:
+        if 'view.php' in raw_href:
+            match = re.search(r"view\.php\?no=\d+", raw_href)
+            if match:
+                link = f"http://www.roadrun.co.kr/schedule/{match.group(0)}"
+        elif not raw_href.startswith('http') and not raw_href.startswith('javascript'):
+             link = f"http://www.roadrun.co.kr/schedule/{raw_href}"
+        else:
+            link = raw_href 
+
+    return {
+        "date": date_text,
+        "date_raw": date_raw, # Keep raw for debugging
+        "name": name_text,
+        "location": location_text,
+        "organizer": organizer_text,
+        "link": link,
+    }
+
+def parse_schedule_html(html, backend=None, known_rows=None):
+    """
+    Parses the roadrun list page HTML into event dicts.
+    Separated from fetching so it can run offline against saved pages.
+    known_rows maps row fingerprint -> list fields of a row seen on an earlier run
+    (data_manager.load_known_rows): such rows are copied instead of rebuilt.
+    Every row is returned either way, since cross-validation needs the whole list.
+    Each event keeps its list fields under 'list_row' for the next run.
+    """
+    known_rows = known_rows or {}
+    events = []
+    for cells in iter_schedule_rows(html, backend):
+        if not _is_event_row(cells):
+            continue
+        fingerprint = row_fingerprint(cells)
+        list_row = known_rows.get(fingerprint) or _build_schedule_event(cells)
+        event = dict(list_row)
+        event['list_row'] = list_row
+        event['row_fingerprint'] = fingerprint
+        event['scraped_at'] = datetime.datetime.now().isoformat()
+        events.append(event)
+    return events
+
+def fetch_marathon_schedule(known_rows=None):
     """
     Fetches the marathon schedule from marathon.pe.kr
+    Rows whose fingerprint is in known_rows are not rebuilt (see parse_schedule_html).
     Returns a list of dictionaries with event details.
     """
     url = "http://www.roadrun.co.kr/schedule/list.php"
     try:
-        response = requests.get(url, timeout=10)
-        response.encoding = 'euc-kr' 
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        events = []
-        
-        # Finding the main table
-        tables = soup.find_all('table')
-        
-        target_table = None
-        for i, table in enumerate(tables):
-            txt = table.get_text()
-            if '대회명' in txt and '장소' in txt:
-                target_table = table
-                break
-        
-        if not target_table:
-            rows = soup.find_all('tr')
-        else:
-            rows = target_table.find_all('tr')
-
-
-        for row in rows:
-            cols = row.find_all('td', recursive=False)
-            
-            if len(cols) != 4:
-                continue
-            
-            date_raw = cols[0].get_text(strip=True)
-            name_element = cols[1].find('a')
-            name_text = cols[1].get_text(strip=True)
-            location_text = cols[2].get_text(strip=True)
-            organizer_text = cols[3].get_text(strip=True)
-            
-            if not date_raw or "날짜" in date_raw:
-                continue
-
-            # Normalize Date
-            date_text = normalize_date(date_raw)
-
-            link = ""
-            if name_element and 'href' in name_element.attrs:
-                raw_href = name_element['href']
-                if 'view.php' in raw_href:
-                    match = re.search(r"view\.php\?no=\d+", raw_href)
-                    if match:
-                        link = f"http://www.roadrun.co.kr/schedule/{match.group(0)}"
-                elif not raw_href.startswith('http') and not raw_href.startswith('javascript'):
-                     link = f"http://www.roadrun.co.kr/schedule/{raw_href}"
-                else:
-                    link = raw_href 
-
-            if name_text:
-                 events.append({
-                    "date": date_text,
-                    "date_raw": date_raw, # Keep raw for debugging
-                    "name": name_text,
-                    "location": location_text,
-                    "organizer": organizer_text,
-                    "link": link,
-                    "scraped_at": datetime.datetime.now().isoformat()
-                })
-                
-        return events
+        html = fetch_text(url, encoding='euc-kr', source='roadrun_list')
+        return parse_schedule_html(html, known_rows=known_rows)
 
     except Exception as e:
         print(f"Error fetching schedule: {e}")
         return []
 
-def fetch_event_details(url):
+def parse_event_details_html(html, backend=None):
+    """
+    Parses a roadrun view.php detail page HTML into a details dict.
+    Returns {} when the detail table cannot be located.
+    """
+    soup = BeautifulSoup(html, backend or PARSER_BACKEND)
+    
+    # The details are in a table with bgcolor='steelblue' usually (from debug html)
+    # or we find the table with the form 'signform'
+    
+    details = {}
+    
+    # Target table heuristics
+    tables = soup.find_all('table')
+    target_table = None
+    for table in tables:
+        if table.find('form', attrs={'name': 'signform'}):
+            target_table = table
+            break
+    
+    # Determine the inner table (bgcolor steelblue or with rows)
+    if target_table:
+        # The structure is Table -> TR -> TD -> Table (steelblue) -> TRs
+        inner_table = target_table.find('table', attrs={'bgcolor': 'steelblue'})
+        if inner_table:
+            target_table = inner_table
+    
+    if not target_table:
+         # Fallback: look for a table with "대회명" in it
+         for table in tables:
+             if "대회명" in table.get_text():
+                 target_table = table
+                 break
+
+    if not target_table:
+        return {}
+
+    rows = target_table.find_all('tr')
+    # Row 0: Event Name (Checking if matches '대회명' label would be safer but order seems fixed)
+    # Structure is Label TD, Value TD
+    
+    def get_val(row_idx):
+        if row_idx < len(rows):
+            cols = rows[row_idx].find_all('td')
+            if len(cols) >= 2:
+                return cols[1].get_text(strip=True)
+        return ""
+
+    # Mapping based on observation
+    # 0: Name, 1: Rep, 2: Email, 3: Date, 4: Phone, 5: Category, 6: Region, 7: Location, 8: Organizer, 9: Period, 10: Website, 11: Desc
+    
+    details['name'] = get_val(0)
+    details['representative'] = get_val(1)
+    details['email'] = get_val(2)
+    details['date_time'] = get_val(3)
+    details['phone'] = get_val(4)
+    details['category'] = get_val(5)
+    details['region'] = get_val(6)
+    details['location'] = get_val(7)
+    details['organizer'] = get_val(8)
+    details['registration_period'] = get_val(9)
+    
+    # Website is often a link in row 10
+    if 10 < len(rows):
+        cols = rows[10].find_all('td')
+        if len(cols) >= 2:
+            link = cols[1].find('a')
+            if link and 'href' in link.attrs:
+                details['website'] = link['href']
+            else:
+                details['website'] = cols[1].get_text(strip=True)
+    
+    details['description'] = get_val(11)
+    
+    return details
+
+def fetch_event_details(url, revalidate=False, limiter=None):
     """
     Fetches detailed information for a specific event URL.
+    With revalidate, a cached page is checked with a conditional GET even within its TTL.
+    limiter paces the request per host when it goes to the network (see fetch_text).
     Returns a dictionary with keys:
     - organizer, email, phone, category, location, region, period, website, description, etc.
     """
     try:
-        response = requests.get(url, timeout=10)
-        response.encoding = 'euc-kr' 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # The details are in a table with bgcolor='steelblue' usually (from debug html)
-        # or we find the table with the form 'signform'
-        
-        details = {}
-        
-        # Target table heuristics
-        tables = soup.find_all('table')
-        target_table = None
-        for table in tables:
-            if table.find('form', attrs={'name': 'signform'}):
-                target_table = table
-                break
-        
-        # Determine the inner table (bgcolor steelblue or with rows)
-        if target_table:
-            # The structure is Table -> TR -> TD -> Table (steelblue) -> TRs
-            inner_table = target_table.find('table', attrs={'bgcolor': 'steelblue'})
-            if inner_table:
-                target_table = inner_table
-        
-        if not target_table:
-             # Fallback: look for a table with "대회명" in it
-             for table in tables:
-                 if "대회명" in table.get_text():
-                     target_table = table
-                     break
-
-        if not target_table:
-            return {}
-
-        rows = target_table.find_all('tr')
-        # Row 0: Event Name (Checking if matches '대회명' label would be safer but order seems fixed)
-        # Structure is Label TD, Value TD
-        
-        def get_val(row_idx):
-            if row_idx < len(rows):
-                cols = rows[row_idx].find_all('td')
-                if len(cols) >= 2:
-                    return cols[1].get_text(strip=True)
-            return ""
-
-        # Mapping based on observation
-        # 0: Name, 1: Rep, 2: Email, 3: Date, 4: Phone, 5: Category, 6: Region, 7: Location, 8: Organizer, 9: Period, 10: Website, 11: Desc
-        
-        details['name'] = get_val(0)
-        details['representative'] = get_val(1)
-        details['email'] = get_val(2)
-        details['date_time'] = get_val(3)
-        details['phone'] = get_val(4)
-        details['category'] = get_val(5)
-        details['region'] = get_val(6)
-        details['location'] = get_val(7)
-        details['organizer'] = get_val(8)
-        details['registration_period'] = get_val(9)
-        
-        # Website is often a link in row 10
-        if 10 < len(rows):
-            cols = rows[10].find_all('td')
-            if len(cols) >= 2:
-                link = cols[1].find('a')
-                if link and 'href' in link.attrs:
-                    details['website'] = link['href']
-                else:
-                    details['website'] = cols[1].get_text(strip=True)
-        
-        details['description'] = get_val(11)
-        
-        return details
+        html = fetch_text(url, encoding='euc-kr', source='roadrun_detail', revalidate=revalidate, limiter=limiter)
+        return parse_event_details_html(html)
 
     except Exception as e:
         print(f"Error fetching details for {url}: {e}")
         return {}
 
+def fetch_event_details_batch(links, max_workers=4, rate=1.0, burst=1, revalidate=()):
+    """
+    Fetches detail pages for many links concurrently.
+    Each host gets its own token bucket (`rate` requests/sec, `burst` capacity),
+    so workers stay polite no matter how many are running; pages served from the
+    cache do not use up tokens.
+    Links in `revalidate` (pages of changed events) bypass the cache TTL.
+    Returns a list of detail dicts in the same order as `links` ({} for empty links or failures).
+    """
+    if not links:
+        return []
+
+    limiter = HostRateLimiter(rate=rate, capacity=burst)
+
+    def fetch_one(link):
+        if not link:
+            return {}
+        return fetch_event_details(link, revalidate=link in revalidate, limiter=limiter)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(fetch_one, links))
+
 if __name__ == "__main__":
     # Test run
     # data = fetch_marathon_schedule()
@@ -1,104 +1,285 @@
+import os
 import time
 import sys
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 import datetime
 import re
+from http_session import get_session
+from browser_pool import get_default_pool
 
 # Fix encoding for Windows
-import io
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
 
-def fetch_runninglife_schedule():
+# Event cards: class="flex flex-row items-start gap-2 py-4  cursor-pointer "
+CONTAINER_SELECTOR = "div.flex.flex-row.items-start.cursor-pointer"
+
+def parse_date_text(date_text):
     """
-    Fetches marathon schedule from runninglife.co.kr
-    Returns a list of dictionaries with event details.
+    Parses the contest date as shown on the site (format: 26.02.28) to YYYY-MM-DD.
+    Returns None for anything else.
     """
-    url = "https://mobile.runninglife.co.kr/contest/"
+    if date_text and re.match(r'^\d{2}\.\d{2}\.\d{2}$', date_text):
+        parts = date_text.split('.')
+        year = int('20' + parts[0])
+        month = int(parts[1])
+        day = int(parts[2])
+        return f"{year}-{month:02d}-{day:02d}"
+    return None
+
+def build_event(name, location, date_text, status):
+    """
+    Builds the event dict shared by the Selenium and JSON API fetchers.
+    """
+    return {
+        'source': 'runninglife',
+        'name': name,
+        'location': location,
+        'date': parse_date_text(date_text),
+        'date_raw': date_text,
+        'status': status,
+        'scraped_at': datetime.datetime.now().isoformat()
+    }
+
+def _class_string(tag):
+    # Multi-valued class attribute joined the way BeautifulSoup matches it as a string
+    classes = tag.get('class')
+    if not classes:
+        return ""
+    return classes if isinstance(classes, str) else ' '.join(classes)
+
+def _is_container(tag):
+    if tag.name != 'div':
+        return False
+    classes = _class_string(tag)
+    return 'cursor-pointer' in classes and 'flex flex-row items-start' in classes
+
+def extract_contest_fields(container):
+    """
+    Extracts (name, location, date_text, status) from one event card in a single traversal.
+    - name: div with text-[16px] font-[600] truncate
+    - location / date: text-[14px] text-neutral-70 truncate div whose nearest previous
+      <img> sibling has alt="location" / alt="clock"
+    - status: span with inline-flex font-semibold
+    """
+    name_elem = location_elem = date_elem = status_elem = None
+    # Last <img> seen per parent; in document order this is the nearest previous img sibling
+    last_img = {}
+
+    for tag in container.find_all(True):
+        name = tag.name
+        if name == 'img':
+            last_img[id(tag.parent)] = tag
+        elif name == 'div':
+            classes = _class_string(tag)
+            if not classes or 'truncate' not in classes:
+                continue
+            if name_elem is None and 'text-[16px]' in classes and 'font-[600]' in classes:
+                name_elem = tag
+            if 'text-[14px]' in classes and 'text-neutral-70' in classes:
+                prev = last_img.get(id(tag.parent))
+                alt = prev.get('alt') if prev is not None else None
+                if location_elem is None and alt == 'location':
+                    location_elem = tag
+                elif date_elem is None and alt == 'clock':
+                    date_elem = tag
+        elif name == 'span' and status_elem is None:
+            classes = _class_string(tag)
+            if 'inline-flex' in classes and 'font-semibold' in classes:
+                status_elem = tag
+
+    return (
+        name_elem.get_text(strip=True) if name_elem else "Unknown",
+        location_elem.get_text(strip=True) if location_elem else "",
+        date_elem.get_text(strip=True) if date_elem else "",
+        status_elem.get_text(strip=True) if status_elem else "",
+    )
+
+def parse_runninglife_html(page_source):
+    """
+    Parses the rendered RunningLife contest page into event dicts.
+    """
+    soup = BeautifulSoup(page_source, 'html.parser')
     
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    # Find event containers - they are divs with specific class pattern
+    # From HTML analysis: class="flex flex-row items-start gap-2 py-4  cursor-pointer "
+    event_containers = soup.find_all(_is_container)
+    
+    print(f"Found {len(event_containers)} event containers")
     
     events = []
+    for container in event_containers:
+        try:
+            events.append(build_event(*extract_contest_fields(container)))
+        except Exception as e:
+            print(f"Error parsing event: {e}")
+            continue
     
+    return events
+
+def wait_for_containers(driver, selector=CONTAINER_SELECTOR, timeout=20, stable_for=1.0, poll=0.25):
+    """
+    Waits until the React app has rendered the event list.
+    Ready means at least one container matches `selector` and the container count
+    has not changed for `stable_for` seconds (the list is lazy-loaded in chunks).
+    Returns (container_count, seconds_to_ready). Raises TimeoutException if nothing renders.
+    """
+    start = time.monotonic()
+    WebDriverWait(driver, timeout, poll_frequency=poll).until(
+        lambda d: d.find_elements(By.CSS_SELECTOR, selector)
+    )
+
+    count = len(driver.find_elements(By.CSS_SELECTOR, selector))
+    stable_since = time.monotonic()
+    while time.monotonic() - start < timeout:
+        time.sleep(poll)
+        current = len(driver.find_elements(By.CSS_SELECTOR, selector))
+        if current != count:
+            count = current
+            stable_since = time.monotonic()
+        elif time.monotonic() - stable_since >= stable_for:
+            break
+
+    return count, time.monotonic() - start
+
+# Candidate field names in the API payload, in order of preference
+API_LIST_KEYS = ('data', 'list', 'items', 'contents', 'content', 'result', 'results')
+API_FIELD_KEYS = {
+    'name': ('title', 'name', 'contestName', 'contest_name', 'contestTitle'),
+    'location': ('location', 'place', 'contestPlace', 'contest_place', 'address', 'region'),
+    'date': ('date', 'contestDate', 'contest_date', 'eventDate', 'startDate', 'start_date'),
+    'status': ('status', 'statusName', 'status_name', 'receiptStatus', 'registrationStatus'),
+}
+
+def _first_value(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return ''
+
+def _api_items(payload):
+    # The list may be the payload itself or nested one or two levels deep (e.g. {"data": {"list": [...]}})
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in API_LIST_KEYS:
+            if key in payload:
+                items = _api_items(payload[key])
+                if items is not None:
+                    return items
+    return None
+
+API_DATE_RE = re.compile(r'^(\d{2}|\d{4})[-./](\d{1,2})[-./](\d{1,2})(?:$|[T\s])')
+API_COMPACT_DATE_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})$')
+
+def _api_date_text(value):
+    """
+    Converts an API date ('2026-02-28', '2026-2-8', '2026.02.28', '20260228', ISO datetime, ...)
+    into the '26.02.28' form the web page shows, so dicts match the Selenium path.
+    Returns None if the value is not a valid date.
+    """
+    text = str(value).strip()
+    match = API_DATE_RE.match(text) or API_COMPACT_DATE_RE.match(text)
+    if not match:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    if year < 100:
+        year += 2000
     try:
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.get(url)
-        
-        # Wait for React app to load
-        print("Waiting for page to load...")
-        time.sleep(5)
-        page_source = driver.page_source
-        driver.quit()
-        
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Find event containers - they are divs with specific class pattern
-        # From HTML analysis: class="flex flex-row items-start gap-2 py-4  cursor-pointer "
-        event_containers = soup.find_all('div', class_=lambda x: x and 'cursor-pointer' in x and 'flex flex-row items-start' in x)
-        
-        print(f"Found {len(event_containers)} event containers")
-        
-        for container in event_containers:
+        date = datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return date.strftime('%y.%m.%d')
+
+def parse_runninglife_api(payload):
+    """
+    Converts the contest list JSON into event dicts identical to the Selenium scraper's.
+    Items without a name or a valid date are dropped (e.g. the payload uses keys we do not know).
+    Returns None if the payload does not contain a contest list or no item is usable.
+    """
+    items = _api_items(payload)
+    if items is None:
+        return None
+
+    events = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = str(_first_value(item, API_FIELD_KEYS['name'])).strip()
+        date_value = _first_value(item, API_FIELD_KEYS['date'])
+        date_text = _api_date_text(date_value) if date_value else None
+        if not name or not date_text:
+            continue
+        location = str(_first_value(item, API_FIELD_KEYS['location'])).strip()
+        status = str(_first_value(item, API_FIELD_KEYS['status'])).strip()
+        events.append(build_event(name, location, date_text, status))
+    return events or None
+
+def fetch_runninglife_schedule_api(url=None, timeout=10):
+    """
+    Fetches the contest list from the JSON endpoint behind the RunningLife SPA.
+    The endpoint comes from `url` or the RUNNINGLIFE_API_URL environment variable;
+    without either we return None and the caller renders the page with Selenium.
+    Returns a list of event dicts, or None if the endpoint is not configured or unusable.
+    """
+    url = url or os.getenv("RUNNINGLIFE_API_URL", "")
+    if not url:
+        return None
+
+    try:
+        response = get_session().get(url, timeout=timeout, headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        events = parse_runninglife_api(response.json())
+    except Exception as e:
+        print(f"Error fetching RunningLife API: {e}")
+        return None
+
+    if events is None:
+        print("RunningLife API response did not contain usable contests.")
+        return None
+
+    print(f"Successfully extracted {len(events)} events (API)")
+    return events
+
+def fetch_runninglife_schedule(pool=None):
+    """
+    Fetches marathon schedule from runninglife.co.kr
+    Uses the JSON API when available and falls back to rendering the page with Selenium.
+    Returns a list of dictionaries with event details.
+    """
+    events = fetch_runninglife_schedule_api()
+    if events:
+        return events
+    return fetch_runninglife_schedule_selenium(pool)
+
+def fetch_runninglife_schedule_selenium(pool=None):
+    """
+    Renders the RunningLife contest page in headless Chrome and parses the event cards.
+    The driver is borrowed from `pool` (default: the shared browser_pool), so repeated
+    scrapes in one process reuse a warm Chrome.
+    Returns a list of dictionaries with event details.
+    """
+    url = "https://mobile.runninglife.co.kr/contest/"
+    pool = pool or get_default_pool()
+    
+    try:
+        with pool.borrow() as driver:
+            driver.get(url)
+            
+            # Wait for React app to render the event list
+            print("Waiting for page to load...")
             try:
-                # Extract event name (text-[16px] font-[600] truncate)
-                name_elem = container.find('div', class_=lambda x: x and 'text-[16px]' in x and 'font-[600]' in x and 'truncate' in x)
-                event_name = name_elem.get_text(strip=True) if name_elem else "Unknown"
-                
-                # Extract location (look for location icon parent)
-                location_elem = None
-                for elem in container.find_all('div', class_=lambda x: x and 'text-[14px]' in x and 'text-neutral-70' in x and 'truncate' in x):
-                    # Check if previous sibling has location icon
-                    prev = elem.find_previous_sibling('img')
-                    if prev and prev.get('alt') == 'location':
-                        location_elem = elem
-                        break
-                
-                location = location_elem.get_text(strip=True) if location_elem else ""
-                
-                # Extract date (look for clock icon parent)
-                date_elem = None
-                for elem in container.find_all('div', class_=lambda x: x and 'text-[14px]' in x and 'text-neutral-70' in x and 'truncate' in x):
-                    prev = elem.find_previous_sibling('img')
-                    if prev and prev.get('alt') == 'clock':
-                        date_elem = elem
-                        break
-                
-                date_text = date_elem.get_text(strip=True) if date_elem else ""
-                
-                # Extract registration status
-                status_elem = container.find('span', class_=lambda x: x and 'inline-flex' in x and 'font-semibold' in x)
-                status = status_elem.get_text(strip=True) if status_elem else ""
-                
-                # Parse date (format: 26.02.28)
-                event_date = None
-                if date_text and re.match(r'^\d{2}\.\d{2}\.\d{2}$', date_text):
-                    parts = date_text.split('.')
-                    year = int('20' + parts[0])
-                    month = int(parts[1])
-                    day = int(parts[2])
-                    event_date = f"{year}-{month:02d}-{day:02d}"
-                
-                events.append({
-                    'source': 'runninglife',
-                    'name': event_name,
-                    'location': location,
-                    'date': event_date,
-                    'date_raw': date_text,
-                    'status': status,
-                    'scraped_at': datetime.datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                print(f"Error parsing event: {e}")
-                continue
+                ready_count, ready_seconds = wait_for_containers(driver)
+                print(f"Page ready: {ready_count} containers after {ready_seconds:.2f}s")
+            except TimeoutException:
+                print("Timed out waiting for event containers; parsing whatever has rendered.")
+            page_source = driver.page_source
         
+        events = parse_runninglife_html(page_source)
         print(f"Successfully extracted {len(events)} events")
         return events
         
@@ -0,0 +1,103 @@
+"""
+Registry of race calendar sources.
+Each source is a name plus a fetch function returning a list of event dicts.
+Sources are reconciled in priority order (lowest first); the first one is the
+primary source whose records carry links and detail pages.
+Adding a calendar only needs a register_source() call here.
+"""
+
+import threading
+import time
+
+from data_manager import load_known_rows
+from scraper import fetch_marathon_schedule
+from scraper_runninglife import fetch_runninglife_schedule
+
+
+DEFAULT_TIMEOUT = 90
+
+
+class Source:
+    def __init__(self, name, fetch, priority=100, description="", timeout=DEFAULT_TIMEOUT):
+        self.name = name
+        self.fetch = fetch
+        self.priority = priority
+        self.description = description or name
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"Source({self.name!r}, priority={self.priority})"
+
+
+_registry = {}
+
+
+def register_source(name, fetch, priority=100, description="", timeout=DEFAULT_TIMEOUT):
+    """
+    Registers (or replaces) a source. fetch() must return a list of event dicts
+    with at least 'name' and a YYYY-MM-DD 'date'. timeout is the number of seconds
+    fetch_all_sources waits for it.
+    """
+    source = Source(name, fetch, priority, description, timeout)
+    _registry[name] = source
+    return source
+
+
+def unregister_source(name):
+    _registry.pop(name, None)
+
+
+def get_sources():
+    """Returns registered sources in priority order."""
+    return sorted(_registry.values(), key=lambda s: s.priority)
+
+
+def _run_source(source, result):
+    start = time.monotonic()
+    try:
+        result['events'] = source.fetch() or []
+    except Exception as e:
+        print(f"Error fetching from {source.name}: {e}")
+        result['events'] = []
+    result['seconds'] = time.monotonic() - start
+
+
+def fetch_all_sources(sources=None):
+    """
+    Scrapes all sources concurrently, one thread per source.
+    Each source is waited for at most its own timeout (counted from the common start);
+    a source that times out or fails contributes an empty list while the others'
+    results are kept. Threads are daemonic, so a hung scraper cannot keep the process alive.
+    Returns {source name: events} in priority order.
+    """
+    sources = get_sources() if sources is None else sources
+    start = time.monotonic()
+
+    running = []
+    for source in sources:
+        print(f"Fetching schedule from {source.description}...")
+        result = {}
+        thread = threading.Thread(target=_run_source, args=(source, result), name=f"fetch-{source.name}", daemon=True)
+        thread.start()
+        running.append((source, thread, result))
+
+    events_by_source = {}
+    for source, thread, result in running:
+        thread.join(max(0, start + source.timeout - time.monotonic()))
+        if thread.is_alive():
+            print(f"{source.name}: timed out after {source.timeout}s, continuing without it")
+            events_by_source[source.name] = []
+        else:
+            print(f"{source.name}: {len(result['events'])} events in {result['seconds']:.1f}s")
+            events_by_source[source.name] = result['events']
+
+    return events_by_source
+
+
+def fetch_roadrun_schedule():
+    # Rows unchanged since the last run are copied from the event store instead of rebuilt
+    return fetch_marathon_schedule(known_rows=load_known_rows())
+
+
+register_source('roadrun', fetch_roadrun_schedule, priority=0, description='roadrun.co.kr', timeout=60)
+register_source('runninglife', fetch_runninglife_schedule, priority=10, description='runninglife.co.kr', timeout=120)
@@ -0,0 +1,161 @@
+"""
+Offline checks for BrowserPool with stub drivers instead of Chrome.
+"""
+
+import threading
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class StubDriver:
+    def __init__(self, number):
+        self.number = number
+        self.heap_mb = 10
+        self.healthy = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        if script == "return 1":
+            return 1
+        return self.heap_mb * 1024 * 1024
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class StubFactory:
+    def __init__(self):
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            driver = StubDriver(len(self.drivers))
+            self.drivers.append(driver)
+            return driver
+
+
+def make_pool(**kwargs):
+    factory = StubFactory()
+    return BrowserPool(driver_factory=factory, **kwargs), factory
+
+
+def without_psutil(fn):
+    # The JS heap fallback is what the stub driver can report
+    previous = browser_pool.psutil
+    browser_pool.psutil = None
+    try:
+        return fn()
+    finally:
+        browser_pool.psutil = previous
+
+
+def test_checkout_reuses_a_warm_driver():
+    pool, factory = make_pool(max_uses=10)
+    with pool.borrow() as first:
+        pass
+    with pool.borrow() as second:
+        pass
+    assert first is second
+    assert len(factory.drivers) == 1 and first.quit_calls == 0
+
+
+def test_driver_is_recycled_after_max_uses():
+    pool, factory = make_pool(max_uses=3)
+    used = []
+    for _ in range(7):
+        with pool.borrow() as driver:
+            used.append(driver.number)
+    assert used == [0, 0, 0, 1, 1, 1, 2]
+    assert [d.quit_calls for d in factory.drivers] == [1, 1, 0]
+
+
+def test_broken_and_unhealthy_drivers_are_replaced():
+    pool, factory = make_pool()
+    try:
+        with pool.borrow():
+            raise ValueError("scrape failed")
+    except ValueError:
+        pass
+    assert factory.drivers[0].quit_calls == 1
+
+    with pool.borrow() as driver:
+        assert driver.number == 1
+    driver.healthy = False
+    with pool.borrow() as driver:
+        assert driver.number == 2
+    assert factory.drivers[1].quit_calls == 1
+
+
+def test_memory_check_recycles_a_bloated_driver():
+    def run():
+        pool, factory = make_pool(max_memory_mb=100)
+        with pool.borrow() as driver:
+            pass
+        with pool.borrow() as again:
+            again.heap_mb = 500
+        with pool.borrow() as fresh:
+            pass
+        return driver, again, fresh
+
+    driver, again, fresh = without_psutil(run)
+    assert driver is again
+    assert fresh is not driver and driver.quit_calls == 1
+
+
+def test_pool_size_limits_concurrent_drivers():
+    pool, factory = make_pool(size=2)
+    lock = threading.Lock()
+    state = {'active': 0, 'max_active': 0}
+    barrier = threading.Barrier(2)
+
+    def worker():
+        with pool.borrow():
+            with lock:
+                state['active'] += 1
+                state['max_active'] = max(state['max_active'], state['active'])
+            try:
+                barrier.wait(0.2)
+            except threading.BrokenBarrierError:
+                pass
+            with lock:
+                state['active'] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert state['max_active'] == 2
+    assert len(factory.drivers) == 2
+
+
+def test_shutdown_quits_idle_drivers_and_refuses_new_loans():
+    pool, factory = make_pool(size=2)
+    with pool.borrow() as held:
+        with pool.borrow() as idle:
+            pass
+        pool.shutdown()
+        assert idle.quit_calls == 1 and held.quit_calls == 0
+    # Returned after shutdown: quit instead of pooled
+    assert held.quit_calls == 1
+    try:
+        with pool.borrow():
+            pass
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("borrow after shutdown should fail")
+
+
+if __name__ == "__main__":
+    test_checkout_reuses_a_warm_driver()
+    test_driver_is_recycled_after_max_uses()
+    test_broken_and_unhealthy_drivers_are_replaced()
+    test_memory_check_recycles_a_bloated_driver()
+    test_pool_size_limits_concurrent_drivers()
+    test_shutdown_quits_idle_drivers_and_refuses_new_loans()
+    print("✓ browser pool checks passed")
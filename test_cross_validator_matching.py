@@ -0,0 +1,229 @@
+"""
+Offline checks for cross_validator matching.
+Compares the indexed matcher against the original full-scan matcher
+on names taken from the saved roadrun list page.
+"""
+
+import datetime
+import math
+import random
+from difflib import SequenceMatcher
+
+from bench_parsers import load_fixture, LIST_FIXTURE
+from scraper import parse_schedule_html
+import cross_validator
+from cross_validator import normalize_event_name, match_events, cross_validate_events, CandidateIndex, NgramScorer, assign_matches, reconcile_events
+
+def full_scan_match(roadrun_event, runninglife_events, threshold=0.6):
+    # Original O(M) implementation, kept for comparison
+    if not roadrun_event.get('name'):
+        return None
+    roadrun_normalized = normalize_event_name(roadrun_event['name'])
+    best_match = None
+    best_score = 0
+    for rl_event in runninglife_events:
+        if not rl_event.get('name'):
+            continue
+        score = SequenceMatcher(None, roadrun_normalized, normalize_event_name(rl_event['name'])).ratio()
+        if roadrun_event.get('date') and rl_event.get('date'):
+            try:
+                date1 = datetime.datetime.strptime(roadrun_event['date'], '%Y-%m-%d').date()
+                date2 = datetime.datetime.strptime(rl_event['date'], '%Y-%m-%d').date()
+                if abs((date1 - date2).days) <= 3:
+                    score += 0.2
+            except ValueError:
+                pass
+        if score > best_score:
+            best_score = score
+            best_match = rl_event
+    if best_score >= threshold:
+        return best_match, best_score
+    return None
+
+def make_sources(seed=7):
+    rng = random.Random(seed)
+    roadrun = parse_schedule_html(load_fixture(LIST_FIXTURE))
+    runninglife = []
+    for event in roadrun:
+        if rng.random() < 0.3:
+            continue
+        name = event['name']
+        # Typical differences between the two sites
+        variant = rng.choice([
+            name,
+            name.replace(' ', ''),
+            f"제{rng.randint(1, 30)}회 {name}",
+            name + " 대회",
+            name[: max(4, len(name) // 2)],
+        ])
+        date = event['date']
+        if rng.random() < 0.3:
+            shifted = datetime.date.fromisoformat(date) + datetime.timedelta(days=rng.randint(-5, 5))
+            date = shifted.isoformat()
+        runninglife.append({'name': variant, 'date': date, 'location': event['location'], 'status': '접수중',
+                            'origin': id(event)})
+    rng.shuffle(runninglife)
+    return roadrun, runninglife
+
+def test_index_keeps_true_matches():
+    roadrun, runninglife = make_sources()
+    index = CandidateIndex(runninglife)
+    agree = 0
+    for event in roadrun:
+        expected = full_scan_match(event, runninglife)
+        actual = match_events(event, runninglife, index=index)
+        if (expected and expected[0]) is (actual and actual[0]):
+            agree += 1
+            if expected:
+                assert abs(expected[1] - actual[1]) < 1e-9
+        # Blocking may only drop spurious matches that share no distinctive bigram,
+        # never the variant generated from this very event
+        if expected and expected[0]['origin'] == id(event):
+            assert actual and actual[0] is expected[0], event['name']
+    assert agree >= len(roadrun) * 0.9, agree
+
+def test_candidates_are_a_small_subset():
+    roadrun, runninglife = make_sources()
+    index = CandidateIndex(runninglife)
+    sizes = [
+        len(index.candidates(normalize_event_name(e['name']), datetime.date.fromisoformat(e['date'])))
+        for e in roadrun
+    ]
+    assert sum(sizes) / len(sizes) < len(runninglife) / 2
+
+def test_ngram_scorer_agrees_with_sequence_matcher():
+    roadrun, runninglife = make_sources()
+    index = CandidateIndex(runninglife)
+    agree = sequence_true = ngram_true = 0
+    for event in roadrun:
+        sequence = match_events(event, runninglife, index=index)
+        ngram = match_events(event, runninglife, index=index, scorer='ngram')
+        agree += (sequence and sequence[0]) is (ngram and ngram[0])
+        sequence_true += bool(sequence and sequence[0]['origin'] == id(event))
+        ngram_true += bool(ngram and ngram[0]['origin'] == id(event))
+    assert agree >= len(roadrun) * 0.8, agree
+    assert ngram_true >= sequence_true * 0.95, (ngram_true, sequence_true)
+
+def test_ngram_scorer_pure_python_fallback():
+    # Bigrams + trigrams: abcd -> ab bc cd abc bcd, abab -> ab x2, ba, aba, bab
+    names = ['abcd', 'abce', 'xyz', 'a']
+    queries = ['abcd', 'abab', 'xyzw', 'zz']
+    expected = [
+        [1.0, 3 / 5, 0.0, 0.0],
+        [2 / math.sqrt(35), 2 / math.sqrt(35), 0.0, 0.0],
+        [0.0, 0.0, 3 / math.sqrt(15), 0.0],
+        [0.0, 0.0, 0.0, 0.0],
+    ]
+    saved, cross_validator.np = cross_validator.np, None
+    try:
+        fallback = NgramScorer(names).similarity_matrix(queries)
+    finally:
+        cross_validator.np = saved
+    assert isinstance(fallback, list)
+    for row, expected_row in zip(fallback, expected):
+        assert len(row) == len(expected_row)
+        for a, b in zip(row, expected_row):
+            assert abs(a - b) < 1e-9, (row, expected_row)
+
+def test_ngram_scorer_numpy_matches_fallback():
+    if cross_validator.np is None:
+        # NumPy is optional; nothing to compare against without it
+        return
+    names = [normalize_event_name(n) for n in ['2026 서울 마라톤', '부산국제마라톤대회', '춘천 마라톤', 'a']]
+    queries = [normalize_event_name(n) for n in ['서울 마라톤 2026', '제22회 부산 국제 마라톤', 'zz']]
+    with_numpy = NgramScorer(names).similarity_matrix(queries).tolist()
+    saved, cross_validator.np = cross_validator.np, None
+    try:
+        fallback = NgramScorer(names).similarity_matrix(queries)
+    finally:
+        cross_validator.np = saved
+    for row_a, row_b in zip(with_numpy, fallback):
+        for a, b in zip(row_a, row_b):
+            assert abs(a - b) < 1e-5
+
+def test_global_assignment_is_one_to_one():
+    roadrun, runninglife = make_sources()
+    for scorer in ('sequence', 'ngram'):
+        assignments = assign_matches(roadrun, runninglife, scorer=scorer)
+        claimed = [id(rl_event) for rl_event, _ in assignments.values()]
+        assert len(claimed) == len(set(claimed))
+        assert all(score >= 0.6 for _, score in assignments.values())
+
+    # Two roadrun events competing for one RunningLife event: the better one wins it
+    roadrun = [
+        {'name': '서울 하프 마라톤', 'date': '2026-04-05'},
+        {'name': '서울 마라톤', 'date': '2026-03-15'},
+    ]
+    runninglife = [{'name': '서울마라톤', 'date': '2026-03-15'}]
+    assignments = assign_matches(roadrun, runninglife)
+    assert list(assignments) == [1]
+
+    greedy = cross_validate_events(roadrun, runninglife, assignment='greedy')
+    assert all(e['validation']['cross_validated'] for e in greedy)
+    one_to_one = cross_validate_events(roadrun, runninglife)
+    assert [e['validation']['cross_validated'] for e in one_to_one] == [False, True]
+
+def test_reconcile_two_sources_matches_cross_validate():
+    roadrun, runninglife = make_sources()
+    legacy = cross_validate_events(roadrun, runninglife)
+    reconciled = reconcile_events({'roadrun': roadrun, 'runninglife': runninglife})
+    assert len(legacy) == len(reconciled)
+    for old, new in zip(legacy, reconciled):
+        for key in ('name', 'date', 'location', 'registration_status', 'link', 'date_runninglife'):
+            assert old.get(key) == new.get(key), key
+        for key in ('source', 'cross_validated', 'confidence', 'match_score'):
+            assert old['validation'][key] == new['validation'][key], key
+
+def test_reconcile_three_sources():
+    events_by_source = {
+        'roadrun': [{'name': '2026 서울 마라톤', 'date': '2026-03-15', 'location': '서울', 'link': 'http://r/1'}],
+        'runninglife': [
+            {'name': '서울 마라톤 2026', 'date': '2026-03-15', 'location': '서울', 'status': '접수중'},
+            {'name': '부산국제마라톤대회', 'date': '2026-04-20', 'location': '부산 해운대', 'status': '접수 예정'},
+        ],
+        'third': [
+            {'name': '서울마라톤', 'date': '2026-03-16', 'location': '서울 광화문'},
+            {'name': '부산 국제 마라톤', 'date': '2026-04-20', 'location': '부산'},
+            {'name': '제주 국제 마라톤', 'date': '2026-11-01', 'location': '제주'},
+        ],
+    }
+    merged = reconcile_events(events_by_source)
+    assert [e['validation']['source'] for e in merged] == ['multiple', 'both', 'third_only']
+
+    seoul = merged[0]
+    assert seoul['link'] == 'http://r/1'
+    assert seoul['registration_status'] == '접수중'
+    assert seoul['date_third'] == '2026-03-16'
+    assert seoul['validation']['field_sources']['registration_status'] == 'runninglife'
+    assert seoul['validation']['field_confidence']['location'] == 'low'
+    assert seoul['validation']['field_confidence']['registration_status'] == 'medium'
+
+    busan = merged[1]
+    assert busan['link'] is None and busan['validation']['sources'] == ['runninglife', 'third']
+
+def test_cross_validate_sample():
+    roadrun = [
+        {'name': '2026 서울 마라톤', 'date': '2026-03-15', 'location': '서울'},
+        {'name': '제22회 부산 국제 마라톤', 'date': '2026-04-20', 'location': '부산'},
+    ]
+    runninglife = [
+        {'name': '서울 마라톤 2026', 'date': '2026-03-15', 'location': '서울 광장', 'status': '접수중'},
+        {'name': '부산국제마라톤대회', 'date': '2026-04-20', 'location': '부산 해운대'},
+    ]
+    for scorer in ('sequence', 'ngram'):
+        results = cross_validate_events(roadrun, runninglife, scorer=scorer)
+        assert len(results) == 2
+        assert all(e['validation']['cross_validated'] for e in results)
+        assert results[0]['registration_status'] == '접수중'
+
+if __name__ == "__main__":
+    test_index_keeps_true_matches()
+    test_candidates_are_a_small_subset()
+    test_ngram_scorer_agrees_with_sequence_matcher()
+    test_ngram_scorer_pure_python_fallback()
+    test_ngram_scorer_numpy_matches_fallback()
+    test_global_assignment_is_one_to_one()
+    test_reconcile_two_sources_matches_cross_validate()
+    test_reconcile_three_sources()
+    test_cross_validate_sample()
+    print("✓ cross_validator matching checks passed")
@@ -0,0 +1,195 @@
+"""
+Offline checks for the event store backends and detect_changes on top of them.
+"""
+
+import json
+import os
+import random
+import tempfile
+
+import data_manager
+from data_manager import MONITORED_FIELDS, EventStore, JsonBackend, SqliteBackend, detect_changes, import_json_events
+
+STORED = {
+    "2026-03-15_서울 마라톤": {"date": "2026-03-15", "name": "서울 마라톤", "location": "서울", "category": "풀"},
+    "2026-04-20_부산 마라톤": {"date": "2026-04-20", "name": "부산 마라톤", "location": "부산"},
+}
+
+def with_backend(backend, fn):
+    previous = data_manager._backend
+    data_manager._backend = backend
+    try:
+        return fn()
+    finally:
+        data_manager._backend = previous
+
+def test_sqlite_load_and_upsert():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteBackend(os.path.join(tmp, "events.db"), json_path=None)
+        store.upsert(STORED)
+        assert store.load() == STORED
+        assert store.count() == 2
+        assert list(store.load(["2026-04-20_부산 마라톤", "missing"])) == ["2026-04-20_부산 마라톤"]
+        assert list(store.load_between("2026-04-01", "2026-04-30")) == ["2026-04-20_부산 마라톤"]
+
+        store.upsert({"2026-04-20_부산 마라톤": {"date": "2026-04-20", "name": "부산 마라톤", "location": "해운대"}})
+        assert store.load()["2026-04-20_부산 마라톤"]["location"] == "해운대"
+        assert store.count() == 2
+
+def test_json_import():
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "events.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(STORED, f, ensure_ascii=False)
+
+        assert import_json_events(json_path, os.path.join(tmp, "a.db")) == 2
+        assert SqliteBackend(os.path.join(tmp, "a.db"), json_path=None).load() == STORED
+
+        # A fresh database picks up the legacy file by itself
+        assert SqliteBackend(os.path.join(tmp, "b.db"), json_path=json_path).load() == STORED
+
+def test_detect_changes_same_on_both_backends():
+    scraped = [
+        {"date": "2026-03-15", "name": "서울 마라톤", "location": "서울 "},
+        {"date": "2026-04-20", "name": "부산 마라톤", "location": "부산 해운대"},
+        {"date": "2026-05-01", "name": "대구 마라톤", "location": "대구"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            JsonBackend(os.path.join(tmp, "events.json")),
+            SqliteBackend(os.path.join(tmp, "events.db"), json_path=None),
+        ]
+        results = []
+        for backend in backends:
+            backend.replace(json.loads(json.dumps(STORED)))
+            events = json.loads(json.dumps(scraped))
+            new, updated = with_backend(backend, lambda: detect_changes(events))
+            results.append(([e["name"] for e in new], [(e["name"], e["change_log"]) for e in updated], backend.load()))
+
+        assert results[0] == results[1]
+        new_names, updated, stored = results[1]
+        assert new_names == ["대구 마라톤"]
+        assert updated == [("부산 마라톤", "Location: 부산 -> 부산 해운대")]
+        # Detail-only fields survive the merge
+        assert stored["2026-03-15_서울 마라톤"]["category"] == "풀"
+        assert len(stored) == 3
+
+class CountingBackend(SqliteBackend):
+    def __init__(self, path):
+        super().__init__(path, json_path=None)
+        self.writes = []
+
+    def upsert(self, events_dict):
+        self.writes.append(sorted(events_dict))
+        super().upsert(events_dict)
+
+def test_event_store_flushes_dirty_keys_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = CountingBackend(os.path.join(tmp, "events.db"))
+        SqliteBackend.upsert(backend, STORED)
+
+        store = EventStore(backend=backend)
+        assert not store.is_empty and len(store) == 2
+        new, updated = detect_changes([{"date": "2026-05-01", "name": "대구 마라톤"}], store)
+        assert [e["name"] for e in new] == ["대구 마라톤"]
+        store.put({"date": "2026-03-15", "name": "서울 마라톤", "description": "상세"})
+        assert backend.writes == []
+
+        assert store.flush() == 2
+        assert store.flush() == 0
+        assert backend.writes == [["2026-03-15_서울 마라톤", "2026-05-01_대구 마라톤"]]
+        assert backend.load()["2026-03-15_서울 마라톤"]["category"] == "풀"
+
+def test_unchanged_rescrape_leaves_store_clean():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = CountingBackend(os.path.join(tmp, "events.db"))
+        SqliteBackend.upsert(backend, STORED)
+        scraped = [{"date": "2026-03-15", "name": "서울 마라톤", "location": "서울 ", "scraped_at": "t1"},
+                   {"date": "2026-04-20", "name": "부산 마라톤", "location": "부산", "scraped_at": "t1"}]
+
+        # Rows saved before digests existed are written back once to get theirs
+        store = EventStore(backend=backend)
+        assert detect_changes(json.loads(json.dumps(scraped)), store) == ([], [])
+        assert store.flush() == 2
+        assert all(e.get("field_digest") for e in backend.load().values())
+
+        for event in scraped:
+            event["scraped_at"] = "t2"
+        store = EventStore(backend=backend)
+        assert detect_changes(json.loads(json.dumps(scraped)), store) == ([], [])
+        assert store.dirty == set()
+        assert store.flush() == 0
+        assert len(backend.writes) == 1
+
+        # Unmonitored fields are still refreshed when they change
+        scraped[1]["validation"] = {"cross_validated": True}
+        store = EventStore(backend=backend)
+        assert detect_changes(json.loads(json.dumps(scraped)), store) == ([], [])
+        assert store.dirty == {"2026-04-20_부산 마라톤"}
+        store.flush()
+        assert backend.load()["2026-04-20_부산 마라톤"]["validation"] == {"cross_validated": True}
+
+def test_json_store_replaces_atomically():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = JsonBackend(os.path.join(tmp, "events.json"))
+        backend.replace(STORED)
+        store = EventStore(["2026-03-15_서울 마라톤"], backend=backend)
+        assert len(store) == 1 and not store.is_empty
+        store.put({"date": "2026-06-01", "name": "광주 마라톤"})
+        store.flush()
+        assert os.listdir(tmp) == ["events.json"]
+        assert len(backend.load()) == 3
+
+def reference_changes(event, stored):
+    # Field-by-field comparison as detect_changes did before digests
+    changes = []
+    for field, label in MONITORED_FIELDS.items():
+        if field in event and event[field]:
+            val_new = str(event[field]).strip()
+            val_old = str(stored.get(field, '')).strip()
+            if val_new != val_old:
+                changes.append(f"{label}: {val_old} -> {val_new}")
+    return ", ".join(changes)
+
+def test_digest_detection_matches_field_diff():
+    rng = random.Random(7)
+    values = {
+        'location': ['서울', '서울 ', '부산', ''],
+        'link': ['http://a', 'http://b', None],
+        'registration_status': ['접수중', '마감', ''],
+        'organizer': ['A', 'B'],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SqliteBackend(os.path.join(tmp, "events.db"), json_path=None)
+        for round_no in range(5):
+            scraped = []
+            for i in range(40):
+                event = {'date': '2026-03-01', 'name': f'대회 {i}'}
+                for field, choices in values.items():
+                    if rng.random() < 0.8:
+                        event[field] = rng.choice(choices)
+                scraped.append(event)
+
+            store = EventStore(backend=backend)
+            before = {key: dict(event) for key, event in store.events.items()}
+            expected = {}
+            for event in scraped:
+                key = f"{event['date']}_{event['name']}"
+                if key in before:
+                    log = reference_changes(event, before[key])
+                    if log:
+                        expected[key] = log
+
+            _, updated = detect_changes(json.loads(json.dumps(scraped)), store)
+            store.flush()
+            assert {f"{e['date']}_{e['name']}": e['change_log'] for e in updated} == expected, round_no
+
+if __name__ == "__main__":
+    test_sqlite_load_and_upsert()
+    test_json_import()
+    test_detect_changes_same_on_both_backends()
+    test_event_store_flushes_dirty_keys_once()
+    test_unchanged_rescrape_leaves_store_clean()
+    test_json_store_replaces_atomically()
+    test_digest_detection_matches_field_diff()
+    print("✓ event store checks passed")
@@ -0,0 +1,288 @@
+"""
+Offline checks for the Notion sync path against an in-memory fake client.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from notion_index import NotionIndex, normalize_property
+from notion_manager import iter_database_pages, sync_event_to_notion, sync_events_to_notion
+
+DB_ID = "db0123456789"
+
+
+class FakeEndpoint:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+class FakeNotion:
+    """Just enough of notion_client.Client: databases, data_sources, pages, search."""
+
+    def __init__(self, pages=(), latency=0):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.pages_by_id = {}
+        self.calls = []
+        self.query_bodies = []
+        for props in pages:
+            self._store(props)
+        self.databases = FakeEndpoint(retrieve=self._retrieve)
+        self.data_sources = FakeEndpoint(query=self._query)
+        self.pages = FakeEndpoint(create=self._create, update=self._update)
+
+    def _store(self, properties):
+        page = {'object': 'page', 'id': str(uuid.uuid4()), 'properties': {}}
+        self._apply(page, properties)
+        self.pages_by_id[page['id']] = page
+        return page
+
+    def _apply(self, page, properties):
+        for name, value in properties.items():
+            prop = dict(value)
+            kind = next(iter(prop))
+            if kind in ('title', 'rich_text'):
+                prop[kind] = [{'plain_text': part['text']['content'], **part} for part in prop[kind]]
+            prop['type'] = kind
+            page['properties'][name] = prop
+
+    def _retrieve(self, database_id):
+        self.calls.append('databases.retrieve')
+        return {'id': database_id, 'data_sources': [{'id': 'ds-' + database_id}]}
+
+    def _query(self, data_source_id, **body):
+        self.calls.append('data_sources.query')
+        self.query_bodies.append(dict(body))
+        pages = list(self.pages_by_id.values())
+        start = int(body.get('start_cursor') or 0)
+        size = body.get('page_size', 100)
+        chunk = pages[start:start + size]
+        more = start + size < len(pages)
+        return {'results': chunk, 'has_more': more, 'next_cursor': str(start + size) if more else None}
+
+    def _slow(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+    def _create(self, parent, properties):
+        self.calls.append('pages.create')
+        self._slow()
+        return self._store(properties)
+
+    def _update(self, page_id, properties):
+        self.calls.append('pages.update')
+        self._slow()
+        self._apply(self.pages_by_id[page_id], properties)
+        return self.pages_by_id[page_id]
+
+    def search(self, **kwargs):
+        raise AssertionError("search should not be used when the index is available")
+
+
+def title(name):
+    return {'title': [{'text': {'content': name}}]}
+
+
+def select(name):
+    return {'select': {'name': name}}
+
+
+def new_index(tmp):
+    return NotionIndex(DB_ID, path=os.path.join(tmp, 'notion_index.json'))
+
+
+def test_index_build_pages_through_the_database():
+    client = FakeNotion([{'대회명': title(f'대회 {i}'), '대회날짜': {'date': {'start': '2026-03-01'}}} for i in range(250)])
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.refresh(client, iter_database_pages)
+        assert len(index) == 250
+        assert client.calls.count('data_sources.query') == 3
+        page_id, entry = index.lookup('2026-03-01_대회 7')
+        assert page_id and entry['title'] == '대회 7'
+
+        # Reloaded from disk without any API call
+        assert len(new_index(tmp)) == 250
+
+
+def test_title_fallback_only_matches_same_date_or_undated_pages():
+    client = FakeNotion([
+        {'대회명': title('서울 마라톤'), '대회날짜': {'date': {'start': '2026-03-15'}}},
+        {'대회명': title('춘천 마라톤')},
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.refresh(client, iter_database_pages)
+        seoul_id, _ = index.lookup('2026-03-15_서울 마라톤')
+        assert seoul_id
+        # Same title, other date: a different race, not the indexed page
+        assert index.lookup('2026-10-01_서울 마라톤', '서울 마라톤') == (None, None)
+        # Whitespace differences still match on the same date
+        assert index.lookup('2026-03-15_서울  마라톤', '서울  마라톤')[0] == seoul_id
+        # Pages without a date can be claimed by title
+        assert index.lookup('2026-10-25_춘천 마라톤', '춘천 마라톤')[0]
+
+
+def test_records_are_saved_on_flush_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.record('page-1', '서울 마라톤', '2026-03-15', {})
+        assert not os.path.exists(index.path)
+        index.flush()
+        assert new_index(tmp).lookup('2026-03-15_서울 마라톤')[0] == 'page-1'
+
+
+def test_iter_database_pages_streams_with_filter():
+    client = FakeNotion([{'대회명': title(f'대회 {i}')} for i in range(230)])
+    page_filter = {"property": "접수 시작일", "date": {"is_not_empty": True}}
+    pages = iter_database_pages(client, DB_ID, filter=page_filter)
+
+    next(pages)
+    assert client.calls.count('data_sources.query') == 1
+    assert client.query_bodies[0] == {'page_size': 100, 'filter': page_filter}
+
+    # No 200-record ceiling
+    assert 1 + sum(1 for _ in pages) == 230
+    assert client.calls.count('data_sources.query') == 3
+    assert client.query_bodies[-1]['start_cursor'] == '200'
+
+
+def test_sync_creates_once_then_updates_and_respects_lock():
+    client = FakeNotion([{'대회명': title('잠긴 대회'), 'AI자동생성여부': select('N')}])
+    event = {'name': '서울 마라톤', 'date': '2026-03-15', 'location': '서울', 'link': 'http://a'}
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.refresh(client, iter_database_pages)
+
+        assert sync_event_to_notion(client, DB_ID, event, index)['status'] == 'created'
+        # Found through the index right away: no duplicate page
+        assert sync_event_to_notion(client, DB_ID, dict(event, location='부산'), index)['status'] == 'updated'
+        assert client.calls.count('pages.create') == 1
+        assert len(client.pages_by_id) == 2
+
+        result = sync_event_to_notion(client, DB_ID, {'name': '잠긴 대회', 'date': '2026-05-01'}, index)
+        assert result['status'] == 'skipped'
+        assert client.calls.count('pages.update') == 1
+
+
+def test_normalize_property_request_and_response_shapes():
+    pairs = [
+        ({"title": [{"text": {"content": "서울 마라톤"}}]},
+         {"type": "title", "title": [{"plain_text": "서울 ", "text": {"content": "서울 "}}, {"plain_text": "마라톤"}]}),
+        ({"rich_text": [{"text": {"content": "2026.01.01 ~ 2026.01.31"}}]},
+         {"type": "rich_text", "rich_text": [{"plain_text": "2026.01.01 ~ 2026.01.31"}]}),
+        ({"select": {"name": "Y"}}, {"type": "select", "select": {"id": "abc", "name": "Y", "color": "green"}}),
+        ({"date": {"start": "2026-01-01T09:00:00+09:00"}},
+         {"type": "date", "date": {"start": "2026-01-01T09:00:00.000+09:00", "end": None, "time_zone": None}}),
+        ({"url": "http://a"}, {"type": "url", "url": "http://a"}),
+    ]
+    for request, response in pairs:
+        assert normalize_property(request) == normalize_property(response), request
+    assert normalize_property({"type": "select", "select": None}) is None
+
+
+def test_resync_sends_only_changed_properties():
+    event = {'name': '서울 마라톤', 'date': '2026-03-15', 'location': '서울', 'link': 'http://a',
+             'registration_period': '2026.01.01 ~ 2026.01.31'}
+    client = FakeNotion()
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.refresh(client, iter_database_pages)
+        assert sync_event_to_notion(client, DB_ID, dict(event), index)['status'] == 'created'
+
+        # A fresh index built from the API's response shapes sees the same values
+        rebuilt = new_index(tmp)
+        rebuilt.synced_at = None
+        rebuilt.refresh(client, iter_database_pages)
+        for idx in (index, rebuilt):
+            assert sync_event_to_notion(client, DB_ID, dict(event), idx)['status'] == 'unchanged'
+        assert 'pages.update' not in client.calls
+
+        update_calls = []
+        original_update = client.pages.update
+        client.pages.update = lambda page_id, properties: update_calls.append(properties) or original_update(page_id, properties)
+        assert sync_event_to_notion(client, DB_ID, dict(event, link='http://b'), rebuilt)['status'] == 'updated'
+        assert update_calls == [{"홈페이지": {"url": "http://b"}}]
+
+
+def page_contents(client):
+    """(title, date) -> list of {property: plain value} for every page in the fake database."""
+    pages = {}
+    for page in client.pages_by_id.values():
+        props = page['properties']
+        name = props['대회명']['title'][0]['plain_text']
+        date = props.get('대회날짜', {}).get('date', {}).get('start')
+        location = props.get('장소', {}).get('select', {}).get('name')
+        pages.setdefault((name, date), []).append({'location': location})
+    return pages
+
+
+def test_concurrent_sync_is_ordered_and_idempotent():
+    client = FakeNotion(latency=0.05)
+    events = []
+    for i in range(8):
+        events.append({'name': f'대회 {i}', 'date': '2026-04-01', 'location': '서울'})
+    # The same event twice (e.g. listed by two sources), and same titles on other dates,
+    # listed before and after the original: each date is its own race and page
+    events += [dict(events[0]),
+               {'name': '대회 0', 'date': '2026-10-01', 'location': '대구'},
+               {'name': '대회 1', 'date': '2025-11-01', 'location': '광주'}]
+    events.insert(0, {'name': '대회 2', 'date': '2026-09-01', 'location': '인천'})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = new_index(tmp)
+        index.refresh(client, iter_database_pages)
+        results = sync_events_to_notion(client, DB_ID, [dict(e) for e in events], max_workers=4, index=index)
+        assert [r['name'] for r in results] == [e['name'] for e in events]
+        assert client.max_in_flight > 1
+
+        expected = {(e['name'], e['date']): [{'location': e['location']}] for e in events}
+        assert len(expected) == 11
+        assert page_contents(client) == expected
+        assert client.calls.count('pages.create') == 11
+        assert 'pages.update' not in client.calls
+
+        # A changed copy lands on its own page only
+        sync_events_to_notion(client, DB_ID, [dict(events[1], location='부산')], index=index)
+        expected[('대회 0', '2026-04-01')] = [{'location': '부산'}]
+        assert page_contents(client) == expected
+
+
+def test_failed_index_build_falls_back_to_search_once():
+    class NoIndexNotion(FakeNotion):
+        def _retrieve(self, database_id):
+            self.calls.append('databases.retrieve')
+            raise RuntimeError('database unavailable')
+
+        def search(self, **kwargs):
+            self.calls.append('search')
+            return {'results': []}
+
+    client = NoIndexNotion()
+    events = [{'name': f'대회 {i}', 'date': '2026-04-01'} for i in range(5)]
+    results = sync_events_to_notion(client, 'db-no-index', events, max_workers=3)
+    assert [r['status'] for r in results] == ['created'] * 5
+    assert client.calls.count('databases.retrieve') == 1
+    assert client.calls.count('search') == 5
+
+
+if __name__ == "__main__":
+    test_index_build_pages_through_the_database()
+    test_title_fallback_only_matches_same_date_or_undated_pages()
+    test_records_are_saved_on_flush_only()
+    test_iter_database_pages_streams_with_filter()
+    test_sync_creates_once_then_updates_and_respects_lock()
+    test_normalize_property_request_and_response_shapes()
+    test_resync_sends_only_changed_properties()
+    test_concurrent_sync_is_ordered_and_idempotent()
+    test_failed_index_build_falls_back_to_search_once()
+    print("✓ notion sync checks passed")
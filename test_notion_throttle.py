@@ -0,0 +1,67 @@
+"""
+Offline checks for the throttled Notion client's retry policy.
+"""
+
+import httpx
+from notion_client.errors import APIResponseError
+
+from notion_throttle import ThrottledClient
+
+
+def api_error(status, code='internal_server_error', headers=None):
+    return httpx.Response(status, headers=headers,
+                          json={'object': 'error', 'status': status, 'code': code, 'message': 'error'})
+
+
+def run_with_responses(responses, method='GET', path='pages/abc', **client_kwargs):
+    """Runs one request against a scripted sequence of responses. Returns (result or error, client, sleeps)."""
+    sleeps = []
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, request.url.path))
+        item = responses[len(calls) - 1]
+        return item if isinstance(item, httpx.Response) else httpx.Response(200, json=item)
+
+    http = httpx.Client(base_url='https://api.notion.com/v1/', transport=httpx.MockTransport(handler))
+    client = ThrottledClient(auth='secret', rate=1000, burst=1000, backoff_base=0.01,
+                             sleep=sleeps.append, client=http, **client_kwargs)
+    try:
+        outcome = client.request(path, method)
+    except APIResponseError as e:
+        outcome = e
+    return outcome, client, sleeps
+
+
+def test_retry_after_is_honoured_on_429():
+    outcome, client, sleeps = run_with_responses(
+        [api_error(429, 'rate_limited', {'Retry-After': '2'}), {'ok': True}])
+    assert outcome == {'ok': True}
+    assert sleeps == [2.0]
+    assert client.stats['calls'] == 2 and client.stats['retries'] == 1 and client.stats['rate_limited'] == 1
+
+
+def test_server_errors_back_off_with_jitter_then_give_up():
+    outcome, client, sleeps = run_with_responses([api_error(502)] * 4, max_retries=3)
+    assert isinstance(outcome, APIResponseError) and outcome.status == 502
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 0.01 * 2 ** i for i, delay in enumerate(sleeps))
+
+
+def test_client_errors_and_page_creation_are_not_retried_blindly():
+    outcome, client, _ = run_with_responses([api_error(400, 'validation_error'), {'ok': True}])
+    assert isinstance(outcome, APIResponseError) and client.stats['calls'] == 1
+
+    # A create that hit a gateway error may have succeeded: do not resend it
+    outcome, client, _ = run_with_responses([api_error(504), {'id': 'new'}], method='POST', path='pages')
+    assert isinstance(outcome, APIResponseError) and client.stats['calls'] == 1
+
+    outcome, client, _ = run_with_responses([api_error(503), {'id': 'new'}], method='POST', path='pages')
+    assert outcome == {'id': 'new'}
+
+
+if __name__ == "__main__":
+    test_retry_after_is_honoured_on_429()
+    test_server_errors_back_off_with_jitter_then_give_up()
+    test_client_errors_and_page_creation_are_not_retried_blindly()
+    print("✓ notion throttle checks passed")
@@ -0,0 +1,121 @@
+"""
+Offline checks for the async enrichment + Notion sync stream with stub fetch/sync functions.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import notion_manager
+import pipeline_async
+from pipeline_async import stream_events
+from test_notion_sync import FakeNotion
+
+
+def run_stream(events, fetch, sync, timeout=10, client=None, **kwargs):
+    """Runs stream_events with fetch_event_details / sync_event_to_notion replaced by stubs."""
+    original_fetch, original_sync = pipeline_async.fetch_event_details, notion_manager.sync_event_to_notion
+    pipeline_async.fetch_event_details = fetch
+    if sync is not None:
+        notion_manager.sync_event_to_notion = sync
+        kwargs.setdefault('search_fallback', True)
+    kwargs.setdefault('rate', 1000)
+    kwargs.setdefault('burst', 1000)
+    client = object() if client is None else client
+    try:
+        return asyncio.run(asyncio.wait_for(stream_events(events, client=client, db_id='db', **kwargs), timeout))
+    finally:
+        pipeline_async.fetch_event_details, notion_manager.sync_event_to_notion = original_fetch, original_sync
+
+
+def make_events(count):
+    return [{'name': f'대회 {i}', 'link': f'http://example.com/{i}'} for i in range(count)]
+
+
+def test_results_come_back_in_input_order():
+    def fetch(link, revalidate=False, limiter=None):
+        time.sleep(random.uniform(0, 0.01))
+        return {'description': link.rsplit('/', 1)[1]}
+
+    def sync(client, db_id, event, page_index=None, search_fallback=False):
+        time.sleep(random.uniform(0, 0.01))
+        return {'status': 'created', 'name': event['name'], 'message': event['description']}
+
+    events = make_events(30)
+    results = run_stream(events, fetch, sync, detail_workers=4, sync_workers=3)
+    assert [r['name'] for r in results] == [e['name'] for e in events]
+    assert [r['message'] for r in results] == [str(i) for i in range(30)]
+    # Events are enriched in place
+    assert events[7]['description'] == '7'
+
+
+def test_slow_sync_holds_back_the_downloads():
+    lock = threading.Lock()
+    counts = {'fetched': 0, 'synced': 0, 'max_ahead': 0}
+
+    def fetch(link, revalidate=False, limiter=None):
+        with lock:
+            counts['fetched'] += 1
+            counts['max_ahead'] = max(counts['max_ahead'], counts['fetched'] - counts['synced'])
+        return {}
+
+    def sync(client, db_id, event, page_index=None, search_fallback=False):
+        time.sleep(0.01)
+        with lock:
+            counts['synced'] += 1
+        return {'status': 'created', 'name': event['name'], 'message': ''}
+
+    results = run_stream(make_events(40), fetch, sync, detail_workers=2, sync_workers=1, queue_size=3)
+    assert len(results) == 40
+    # At most: the sync queue, one event per enricher waiting to put, one being synced, one being fetched
+    assert counts['max_ahead'] <= 3 + 2 + 1 + 1, counts
+
+
+def test_failing_workers_do_not_hang_the_pipeline():
+    def fetch(link, revalidate=False, limiter=None):
+        number = int(link.rsplit('/', 1)[1])
+        if number % 5 == 0:
+            raise RuntimeError('detail page down')
+        if number % 5 == 1:
+            return None  # breaks merge_details
+        return {'description': 'ok'}
+
+    def sync(client, db_id, event, page_index=None, search_fallback=False):
+        if event['name'].endswith('2'):
+            raise RuntimeError('notion down')
+        return {'status': 'created', 'name': event['name'], 'message': ''}
+
+    events = make_events(20)
+    # More events than the queues hold: a dead worker would leave the producer blocked
+    results = run_stream(events, fetch, sync, timeout=5, detail_workers=2, sync_workers=2, queue_size=2)
+    assert [r['name'] for r in results] == [e['name'] for e in events]
+    statuses = [r['status'] for r in results]
+    assert statuses == ['error' if e['name'].endswith('2') else 'created' for e in events]
+
+
+def test_index_is_built_once_for_the_stream():
+    class NoIndexNotion(FakeNotion):
+        def _retrieve(self, database_id):
+            self.calls.append('databases.retrieve')
+            raise RuntimeError('database unavailable')
+
+        def search(self, **kwargs):
+            self.calls.append('search')
+            return {'results': []}
+
+    client = NoIndexNotion()
+    events = [{'name': f'대회 {i}', 'date': '2026-04-01'} for i in range(6)]
+    results = run_stream(events, lambda link, revalidate=False, limiter=None: {}, None, client=client)
+    assert [r['status'] for r in results] == ['created'] * 6
+    # A failed build is not retried per event: the workers search instead
+    assert client.calls.count('databases.retrieve') == 1
+    assert client.calls.count('search') == 6
+
+
+if __name__ == "__main__":
+    test_results_come_back_in_input_order()
+    test_slow_sync_holds_back_the_downloads()
+    test_failing_workers_do_not_hang_the_pipeline()
+    test_index_is_built_once_for_the_stream()
+    print("✓ async pipeline checks passed")
@@ -0,0 +1,100 @@
+"""
+Offline checks for the token bucket (with a fake clock) and the batched detail fetcher.
+"""
+
+import random
+import threading
+import time
+
+import scraper
+from rate_limiter import HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """monotonic() stand-in whose sleep() just advances the time."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_a_burst_then_paces_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.sleeps == []
+
+    # Empty: each further token takes 1 / rate seconds
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 0.5
+    assert clock.now == 101.0
+
+
+def test_bucket_refills_up_to_capacity_only():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == 1.0
+
+
+def test_default_rate_is_one_request_per_second_per_host():
+    limiter = HostRateLimiter()
+    bucket = limiter.bucket_for('a')
+    assert (bucket.rate, bucket.capacity) == (1.0, 1.0)
+    assert limiter.bucket_for('a') is bucket
+    # Other hosts have their own bucket
+    assert limiter.bucket_for('b') is not bucket
+
+
+def test_rejects_non_positive_rate():
+    try:
+        TokenBucket(0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("rate 0 should be rejected")
+
+
+def test_batch_returns_details_in_input_order():
+    calls = []
+    lock = threading.Lock()
+
+    def fake_fetch(link, revalidate=False, limiter=None):
+        time.sleep(random.uniform(0, 0.01))
+        with lock:
+            calls.append((link, revalidate))
+        return {'description': link}
+
+    links = [f'http://host{i % 3}.example/view.php?no={i}' for i in range(12)]
+    links[5] = ''
+    original = scraper.fetch_event_details
+    scraper.fetch_event_details = fake_fetch
+    try:
+        details = scraper.fetch_event_details_batch(links, max_workers=4, rate=1000, burst=1000,
+                                                    revalidate={links[2]})
+    finally:
+        scraper.fetch_event_details = original
+
+    assert details == [{'description': link} if link else {} for link in links]
+    assert len(calls) == 11
+    assert [link for link, revalidate in calls if revalidate] == [links[2]]
+    assert scraper.fetch_event_details_batch([]) == []
+
+
+if __name__ == "__main__":
+    test_bucket_allows_a_burst_then_paces_at_rate()
+    test_bucket_refills_up_to_capacity_only()
+    test_default_rate_is_one_request_per_second_per_host()
+    test_rejects_non_positive_rate()
+    test_batch_returns_details_in_input_order()
+    print("✓ rate limiter checks passed")
@@ -0,0 +1,150 @@
+"""
+Offline checks for the on-disk response cache and conditional GETs in fetch_text.
+Run with pytest, or directly as a script.
+"""
+
+import json
+import os
+import pathlib
+import tempfile
+
+from http_session import fetch_text
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.encoding = None
+
+
+class FakeSession:
+    """Answers every GET with the next scripted response and records the request headers."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_entries_expire_after_their_source_ttl(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), ttls={'list': 60}, clock=clock)
+    cache.put('http://a', 'body')
+
+    entry, body = cache.get('http://a')
+    assert body == 'body'
+    assert cache.is_fresh(entry, 'list')
+    assert not cache.is_fresh(entry, 'unknown_source')
+
+    clock.now += 59
+    assert cache.is_fresh(cache.get('http://a')[0], 'list')
+    clock.now += 1
+    assert not cache.is_fresh(cache.get('http://a')[0], 'list')
+
+    # A 304 revalidation makes the entry fresh again
+    cache.touch('http://a')
+    assert cache.is_fresh(cache.get('http://a')[0], 'list')
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), max_bytes=25, clock=clock)
+    for url in ('http://a', 'http://b'):
+        cache.put(url, 'x' * 10)
+        clock.now += 1
+    cache.get('http://a')
+    clock.now += 1
+
+    cache.put('http://c', 'x' * 10)
+    assert cache.get('http://a')[1] is not None
+    assert cache.get('http://b') == (None, None)
+    assert cache.get('http://c')[1] is not None
+    assert not os.path.exists(cache._body_path(cache.key_for('http://b')))
+
+
+def test_hits_are_persisted_on_flush_only(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), clock=clock)
+    cache.put('http://a', 'body')
+    saved_at = os.path.getmtime(cache.index_path)
+    with open(cache.index_path, encoding='utf-8') as f:
+        before = json.load(f)
+
+    clock.now += 5
+    cache.get('http://a')
+    with open(cache.index_path, encoding='utf-8') as f:
+        assert json.load(f) == before
+    assert os.path.getmtime(cache.index_path) == saved_at
+
+    cache.flush()
+    reloaded = ResponseCache(str(tmp_path), clock=clock)
+    assert reloaded.get('http://a')[0]['last_access'] == clock.now
+
+
+def test_revalidate_skips_the_ttl_with_a_conditional_get(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={'detail': 3600}, clock=FakeClock())
+    session = FakeSession([
+        FakeResponse(200, 'old', {'ETag': '"v1"'}),
+        FakeResponse(200, 'new', {'ETag': '"v2"'}),
+        FakeResponse(304),
+    ])
+    assert fetch_text('http://a', source='detail', session=session, cache=cache) == 'old'
+    # Within the TTL: served from the cache
+    assert fetch_text('http://a', source='detail', session=session, cache=cache) == 'old'
+    assert len(session.requests) == 1
+
+    # The event changed: the page is revalidated and the new body replaces the cached one
+    assert fetch_text('http://a', source='detail', session=session, cache=cache, revalidate=True) == 'new'
+    assert session.requests[1] == {'If-None-Match': '"v1"'}
+    assert fetch_text('http://a', source='detail', session=session, cache=cache, revalidate=True) == 'new'
+    assert session.requests[2] == {'If-None-Match': '"v2"'}
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.hosts = []
+
+    def acquire(self, host):
+        self.hosts.append(host)
+        return 0.0
+
+
+def test_only_network_requests_wait_for_the_limiter(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={'detail': 3600}, clock=FakeClock())
+    session = FakeSession([FakeResponse(200, 'body', {'ETag': '"v1"'}), FakeResponse(304)])
+    limiter = CountingLimiter()
+    url = 'http://www.roadrun.co.kr/schedule/view.php?no=1'
+
+    assert fetch_text(url, source='detail', session=session, cache=cache, limiter=limiter) == 'body'
+    for _ in range(3):
+        assert fetch_text(url, source='detail', session=session, cache=cache, limiter=limiter) == 'body'
+    assert limiter.hosts == ['www.roadrun.co.kr']
+
+    # A revalidation is a request, so it is paced
+    assert fetch_text(url, source='detail', session=session, cache=cache, limiter=limiter, revalidate=True) == 'body'
+    assert len(limiter.hosts) == 2
+
+
+if __name__ == "__main__":
+    for test in (test_entries_expire_after_their_source_ttl,
+                 test_least_recently_used_bodies_are_evicted,
+                 test_hits_are_persisted_on_flush_only,
+                 test_revalidate_skips_the_ttl_with_a_conditional_get,
+                 test_only_network_requests_wait_for_the_limiter):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
+    print("✓ response cache checks passed")
@@ -0,0 +1,131 @@
+"""
+Offline check that the single-pass RunningLife card extraction
+returns exactly what the original find/find_all based extraction did,
+and that the JSON API path builds the same event dicts.
+"""
+
+from bs4 import BeautifulSoup
+from scraper_runninglife import parse_runninglife_api, parse_runninglife_html, extract_contest_fields, _is_container
+
+def card(name, location, date, status, extra=""):
+    return f"""
+    <div class="flex flex-row items-start gap-2 py-4  cursor-pointer ">
+      <img alt="thumbnail" src="x.png"/>
+      <div class="flex flex-col gap-1">
+        <div class="text-[16px] font-[600] truncate">{name}</div>
+        {extra}
+        <div class="flex flex-row items-center gap-1">
+          <img alt="location" src="location.svg"/>
+          <div class="text-[14px] text-neutral-70 truncate">{location}</div>
+        </div>
+        <div class="flex flex-row items-center gap-1">
+          <img alt="clock" src="clock.svg"/>
+          <span class="sr-only">date</span>
+          <div class="text-[14px] text-neutral-70 truncate">{date}</div>
+        </div>
+        <span class="inline-flex items-center font-semibold rounded">{status}</span>
+      </div>
+    </div>
+    """
+
+FIXTURE_HTML = "<html><body><div id='root'>" + "".join([
+    card("2026 서울 마라톤", "서울 광화문", "26.03.15", "접수중"),
+    card("부산국제마라톤대회", "부산 해운대", "26.04.20", "접수 마감"),
+    # Decoy: a text-[14px] div after a non-icon image must be ignored
+    card("춘천 마라톤", "춘천", "26.10.25", "접수 예정",
+         extra='<img alt="badge" src="b.png"/><div class="text-[14px] text-neutral-70 truncate">광고</div>'),
+    # Missing fields
+    """<div class="flex flex-row items-start gap-2 py-4 cursor-pointer">
+         <div class="text-[14px] text-neutral-70 truncate">no icon</div>
+       </div>""",
+    card("", "", "2026.1.1", ""),
+    # Not a container (order of classes differs)
+    '<div class="items-start flex flex-row cursor-pointer"><div class="text-[16px] font-[600] truncate">X</div></div>',
+]) + "</div></body></html>"
+
+def legacy_extract(container):
+    # Original implementation, kept verbatim for comparison
+    name_elem = container.find('div', class_=lambda x: x and 'text-[16px]' in x and 'font-[600]' in x and 'truncate' in x)
+    event_name = name_elem.get_text(strip=True) if name_elem else "Unknown"
+
+    location_elem = None
+    for elem in container.find_all('div', class_=lambda x: x and 'text-[14px]' in x and 'text-neutral-70' in x and 'truncate' in x):
+        prev = elem.find_previous_sibling('img')
+        if prev and prev.get('alt') == 'location':
+            location_elem = elem
+            break
+    location = location_elem.get_text(strip=True) if location_elem else ""
+
+    date_elem = None
+    for elem in container.find_all('div', class_=lambda x: x and 'text-[14px]' in x and 'text-neutral-70' in x and 'truncate' in x):
+        prev = elem.find_previous_sibling('img')
+        if prev and prev.get('alt') == 'clock':
+            date_elem = elem
+            break
+    date_text = date_elem.get_text(strip=True) if date_elem else ""
+
+    status_elem = container.find('span', class_=lambda x: x and 'inline-flex' in x and 'font-semibold' in x)
+    status = status_elem.get_text(strip=True) if status_elem else ""
+
+    return event_name, location, date_text, status
+
+def test_containers_match_legacy_selector():
+    soup = BeautifulSoup(FIXTURE_HTML, 'html.parser')
+    legacy = soup.find_all('div', class_=lambda x: x and 'cursor-pointer' in x and 'flex flex-row items-start' in x)
+    assert soup.find_all(_is_container) == legacy
+    assert len(legacy) == 5
+
+def test_single_pass_matches_legacy():
+    soup = BeautifulSoup(FIXTURE_HTML, 'html.parser')
+    for container in soup.find_all(_is_container):
+        assert extract_contest_fields(container) == legacy_extract(container)
+
+def test_parse_runninglife_html():
+    events = parse_runninglife_html(FIXTURE_HTML)
+    assert [e['name'] for e in events] == ["2026 서울 마라톤", "부산국제마라톤대회", "춘천 마라톤", "Unknown", ""]
+    assert events[0]['date'] == "2026-03-15"
+    assert events[2]['location'] == "춘천"
+    assert events[3]['location'] == "" and events[3]['date'] is None
+    assert events[4]['date'] is None and events[4]['date_raw'] == "2026.1.1"
+
+FIXTURE_API = {
+    "data": {
+        "list": [
+            {"title": "2026 서울 마라톤", "place": "서울", "contestDate": "2026-03-15", "status": "접수중"},
+            {"title": "부산국제마라톤대회", "place": "부산", "contestDate": "2026-2-8", "status": "접수 예정"},
+            {"title": "춘천 마라톤", "place": "춘천", "contestDate": "2026-10-25T09:00:00+09:00", "status": "접수중"},
+            {"title": "대구 마라톤", "place": "대구", "contestDate": "2026.4.5", "status": ""},
+            {"title": "광주 마라톤", "place": "광주", "contestDate": "20260531", "status": ""},
+            {"title": "없는 날짜", "place": "", "contestDate": "2026-02-30", "status": ""},
+            {"title": "미정", "place": "", "contestDate": "추후 공지", "status": ""},
+            {"title": "", "place": "", "contestDate": "2026-06-01", "status": ""},
+        ]
+    }
+}
+
+def test_parse_runninglife_api_dates():
+    events = parse_runninglife_api(FIXTURE_API)
+    assert [(e['date'], e['date_raw']) for e in events] == [
+        ("2026-03-15", "26.03.15"),
+        ("2026-02-08", "26.02.08"),
+        ("2026-10-25", "26.10.25"),
+        ("2026-04-05", "26.04.05"),
+        ("2026-05-31", "26.05.31"),
+    ]
+    assert events[1]['name'] == "부산국제마라톤대회" and events[1]['source'] == "runninglife"
+    # Same dict shape as the HTML path
+    assert set(events[0]) == set(parse_runninglife_html(FIXTURE_HTML)[0])
+
+def test_parse_runninglife_api_unknown_keys():
+    # Keys we do not know leave no usable item: None sends the caller to the Selenium path
+    assert parse_runninglife_api({'data': [{'contestNm': '서울', 'contestDt': '2026-03-01'}]}) is None
+    assert parse_runninglife_api({'data': []}) is None
+    assert parse_runninglife_api({'unexpected': 1}) is None
+
+if __name__ == "__main__":
+    test_containers_match_legacy_selector()
+    test_single_pass_matches_legacy()
+    test_parse_runninglife_html()
+    test_parse_runninglife_api_dates()
+    test_parse_runninglife_api_unknown_keys()
+    print("✓ RunningLife extraction matches the legacy implementation")
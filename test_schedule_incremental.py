@@ -0,0 +1,80 @@
+"""
+Offline checks for incremental roadrun list parsing against the saved list page.
+Rows seen on an earlier run are copied from the store instead of rebuilt, and the
+result is the same full list the plain parse returns.
+"""
+
+import os
+import tempfile
+
+import scraper
+from bench_parsers import load_fixture, LIST_FIXTURE
+from data_manager import EventStore, SqliteBackend, detect_changes, load_known_rows
+from scraper import parse_schedule_html
+
+HTML = load_fixture(LIST_FIXTURE)
+
+
+def without_scraped_at(events):
+    return [{k: v for k, v in e.items() if k != 'scraped_at'} for e in events]
+
+
+def count_builds(fn):
+    """Runs fn() and returns (result, number of rows built from their cells)."""
+    calls = []
+    original = scraper._build_schedule_event
+    scraper._build_schedule_event = lambda cells: calls.append(cells) or original(cells)
+    try:
+        return fn(), len(calls)
+    finally:
+        scraper._build_schedule_event = original
+
+
+def test_known_rows_are_copied_not_rebuilt():
+    full, built = count_builds(lambda: parse_schedule_html(HTML))
+    assert built == len(full) > 100
+    assert all(e['list_row'] == {f: e[f] for f in scraper.SCHEDULE_ROW_FIELDS} for e in full)
+
+    known = {e['row_fingerprint']: e['list_row'] for e in full[10:]}
+    incremental, built = count_builds(lambda: parse_schedule_html(HTML, known_rows=known))
+    assert built == 10
+    # Every row is still returned, identical to the full parse
+    assert without_scraped_at(incremental) == without_scraped_at(full)
+
+
+def test_changed_rows_get_new_fingerprints():
+    full = parse_schedule_html(HTML)
+    number = full[0]['link'].rsplit('=', 1)[1]
+    changed = HTML.replace(f'no={number}', 'no=99999')
+    known = {e['row_fingerprint']: e['list_row'] for e in full}
+    incremental, built = count_builds(lambda: parse_schedule_html(changed, known_rows=known))
+    assert built == 1
+    assert incremental[0]['link'].endswith('no=99999')
+    assert incremental[0]['row_fingerprint'] != full[0]['row_fingerprint']
+    assert without_scraped_at(incremental[1:]) == without_scraped_at(full[1:])
+
+
+def test_rerun_from_the_store_finds_no_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SqliteBackend(os.path.join(tmp, "events.db"), json_path=None)
+        first = parse_schedule_html(HTML)
+        store = EventStore(backend=backend)
+        detect_changes(first, store)
+        store.flush()
+
+        known = load_known_rows(backend.load())
+        assert len(known) == len({e['row_fingerprint'] for e in first})
+        rerun, built = count_builds(lambda: parse_schedule_html(HTML, known_rows=known))
+        assert built == 0
+
+        store = EventStore(backend=backend)
+        new, updated = detect_changes(rerun, store)
+        assert new == [] and updated == []
+        assert store.dirty == set()
+
+
+if __name__ == "__main__":
+    test_known_rows_are_copied_not_rebuilt()
+    test_changed_rows_get_new_fingerprints()
+    test_rerun_from_the_store_finds_no_changes()
+    print("✓ incremental list parsing checks passed")
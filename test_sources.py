@@ -0,0 +1,71 @@
+"""
+Offline checks for fetch_all_sources with fake slow and failing sources.
+"""
+
+import contextlib
+import io
+import threading
+import time
+
+from sources import Source, fetch_all_sources
+
+
+def run_sources(sources):
+    """Returns (events_by_source, printed output, seconds taken)."""
+    out = io.StringIO()
+    start = time.monotonic()
+    with contextlib.redirect_stdout(out):
+        events_by_source = fetch_all_sources(sources)
+    return events_by_source, out.getvalue(), time.monotonic() - start
+
+
+def test_slow_and_failing_sources_do_not_lose_the_others():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return [{'name': 'too late', 'date': '2026-03-01'}]
+
+    def failing():
+        raise RuntimeError('site is down')
+
+    sources = [
+        Source('primary', lambda: [{'name': '서울 마라톤', 'date': '2026-03-15'}], priority=0, timeout=1),
+        Source('slow', slow, priority=5, timeout=0.2),
+        Source('failing', failing, priority=10, timeout=1),
+        Source('empty', lambda: None, priority=20, timeout=1),
+    ]
+    try:
+        events_by_source, output, seconds = run_sources(sources)
+    finally:
+        release.set()
+
+    assert events_by_source == {
+        'primary': [{'name': '서울 마라톤', 'date': '2026-03-15'}],
+        'slow': [],
+        'failing': [],
+        'empty': [],
+    }
+    assert list(events_by_source) == ['primary', 'slow', 'failing', 'empty']
+    # The slow source is abandoned at its timeout instead of holding up the run
+    assert seconds < 2
+    assert "slow: timed out after 0.2s, continuing without it" in output
+    assert "Error fetching from failing: site is down" in output
+    assert "primary: 1 events in" in output
+
+
+def test_sources_run_concurrently():
+    def sleepy():
+        time.sleep(0.3)
+        return [{'name': 'x', 'date': '2026-01-01'}]
+
+    sources = [Source(f's{i}', sleepy, priority=i, timeout=2) for i in range(4)]
+    events_by_source, _, seconds = run_sources(sources)
+    assert all(len(events) == 1 for events in events_by_source.values())
+    assert seconds < 1
+
+
+if __name__ == "__main__":
+    test_slow_and_failing_sources_do_not_lose_the_others()
+    test_sources_run_concurrently()
+    print("✓ source fetch checks passed")